@@ -0,0 +1,193 @@
+"""Cache-line blocked Bloom Filter Implementation (Putze et al., 2007)."""
+import math
+import sys
+import time
+
+import numpy as np
+
+from bloom_filter import BloomFilter
+from hashing import MASK64, Hasher
+
+BLOCK_BITS = 512  # one 64-byte cache line
+WORDS_PER_BLOCK = BLOCK_BITS // 64
+MAX_HASH_COUNT = 32
+
+
+def _splitmix64(state: int):
+    while True:
+        state = (state + 0x9E3779B97F4A7C15) & MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        yield z ^ (z >> 31)
+
+
+# Odd multipliers, one per probe: bit i of a key is the top 9 bits of
+# h2 * SALTS[i]. Double hashing inside a 512-bit block repeats probe
+# patterns too often and costs measurable false positives.
+_gen = _splitmix64(0x5EED)
+SALTS = [next(_gen) | 1 for _ in range(MAX_HASH_COUNT)]
+_SALTS = np.array(SALTS, dtype=np.uint64)
+
+
+def _standard_fpr(bits: int, items: int, k: int) -> float:
+    """False positive rate of a classic Bloom filter."""
+    return (1 - (1 - 1 / bits) ** (k * items)) ** k
+
+
+def blocked_fpr(size: int, expected_items: int, k: int) -> float:
+    """False positive rate of a blocked filter with `size` bits.
+
+    The number of items landing in one block is Poisson distributed with
+    mean B * n / m, and a block holding i items behaves like a classic
+    filter of B bits, so the blocked rate is the Poisson-weighted average.
+    Blocks that happen to be overloaded make it a little worse than the
+    classic rate for the same m and k.
+    """
+    mean = BLOCK_BITS * expected_items / size
+    fpr = 0.0
+    log_pmf = -mean  # log P(0)
+    for i in range(int(mean + 12 * math.sqrt(mean) + 12)):
+        if i:
+            log_pmf += math.log(mean) - math.log(i)
+        fpr += math.exp(log_pmf) * _standard_fpr(BLOCK_BITS, i, k)
+    return fpr
+
+
+class BlockedBloomFilter:
+    """Bloom filter whose k probes for a key all land in one 64-byte block.
+
+    The first hash half picks the block and the second half derives the k
+    bit positions inside it, so a lookup touches one cache line where a
+    classic filter touches k. That is a memory-traffic property, not a
+    speedup here: in this NumPy implementation each probe still pays for
+    its own array operations, and ``benchmark()`` shows lookups slightly
+    slower than BloomFilter both in cache and at about 60 MB. The blocked
+    layout also needs a few percent more bits for the same rate.
+    """
+
+    def __init__(self, expected_items: int, false_positive_rate: float, hasher: Hasher | None = None):
+        """Initialize the Blocked Bloom Filter."""
+        self.n = expected_items
+        self.p = false_positive_rate
+        self.hasher = hasher or Hasher()
+
+        self.size, self.k = self._get_size_and_hash_count(self.n, self.p)
+        self.num_blocks = self.size // BLOCK_BITS
+        self.count = 0
+
+        # Over-allocate one block so the table can start on a cache line.
+        raw = np.zeros((self.num_blocks + 1) * WORDS_PER_BLOCK, dtype=np.uint64)
+        offset = (-raw.ctypes.data % 64) // 8
+        self.blocks = raw[offset:offset + self.num_blocks * WORDS_PER_BLOCK].reshape(
+            self.num_blocks, WORDS_PER_BLOCK
+        )
+
+    def _get_size_and_hash_count(self, expected_items: int, false_positive_rate: float) -> tuple[int, int]:
+        """Smallest block-aligned m (and its best k) that meets the target rate.
+
+        Starts from the classic optimum and grows m by 5% steps until the
+        blocked rate, which is slightly worse, is back under the target.
+        """
+        size = -(expected_items * math.log(false_positive_rate)) / (math.log(2) ** 2)
+        while True:
+            blocks = max(1, math.ceil(size / BLOCK_BITS))
+            bits = blocks * BLOCK_BITS
+            k = min(range(1, MAX_HASH_COUNT + 1), key=lambda k: blocked_fpr(bits, expected_items, k))
+            if blocked_fpr(bits, expected_items, k) <= false_positive_rate:
+                return bits, k
+            size *= 1.05
+
+    def _probes(self, h1: int, h2: int) -> tuple[int, list[int]]:
+        """Block index and the k bit positions inside the block."""
+        block = ((h1 >> 32) * self.num_blocks) >> 32  # multiply-shift, no modulo
+        return block, [((h2 * salt) & MASK64) >> 55 for salt in SALTS[:self.k]]
+
+    def add(self, item: str | int) -> None:
+        """Add an item to the Blocked Bloom Filter."""
+        block, positions = self._probes(*self.hasher.hash128(item))
+        words = self.blocks[block]
+        for pos in positions:
+            words[pos >> 6] |= np.uint64(1 << (pos & 63))
+        self.count += 1
+
+    def check(self, item: str | int) -> bool:
+        """Check if an item is in the Blocked Bloom Filter."""
+        block, positions = self._probes(*self.hasher.hash128(item))
+        words = self.blocks[block].tolist()  # one cache line, copied once
+        return all(words[pos >> 6] >> (pos & 63) & 1 for pos in positions)
+
+    def _probes_many(self, h1: np.ndarray, h2: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized ``_probes``: block per item, word and bit mask per probe."""
+        block = ((h1 >> np.uint64(32)) * np.uint64(self.num_blocks)) >> np.uint64(32)
+        pos = (h2[:, None] * _SALTS[:self.k]) >> np.uint64(55)
+        return block, pos >> np.uint64(6), np.uint64(1) << (pos & np.uint64(63))
+
+    def add_many(self, items) -> None:
+        """Add a batch of items in one vectorized pass."""
+        items = list(items)
+        if not items:
+            return
+        self._add_digests(*self.hasher.hash128_many(items))
+
+    def _add_digests(self, h1: np.ndarray, h2: np.ndarray) -> None:
+        block, word, mask = self._probes_many(h1, h2)
+        np.bitwise_or.at(self.blocks, (block[:, None], word), mask)
+        self.count += len(h1)
+
+    def check_many(self, items) -> np.ndarray:
+        """Check a batch of items, returns a bool array in input order."""
+        items = list(items)
+        if not items:
+            return np.zeros(0, dtype=bool)
+        return self._check_digests(*self.hasher.hash128_many(items))
+
+    def _check_digests(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        block, word, mask = self._probes_many(h1, h2)
+        # All k words of a key come from the same cache line. The gather
+        # still does k indexed reads per key, which is what dominates here.
+        flat = (block.astype(np.intp) * WORDS_PER_BLOCK)[:, None] + word.astype(np.intp)
+        return ((self.blocks.ravel()[flat] & mask) != 0).all(axis=1)
+
+
+def benchmark(sizes=(200_000, 50_000_000), false_positive_rate: float = 0.01, num_lookups: int = 1_000_000) -> None:
+    """Compare lookup latency with the classic layout, in cache and beyond L3.
+
+    Digests are computed up front so only the probing is timed. The large
+    default gives filters of about 60 MB each. Expect the blocked filter to
+    be no faster: fewer cache lines are touched, but NumPy overhead per
+    probe, not memory latency, sets the cost of a batched lookup.
+    """
+    rng = np.random.default_rng(0)
+    h1 = rng.integers(0, 2**64, size=num_lookups, dtype=np.uint64)
+    h2 = rng.integers(0, 2**64, size=num_lookups, dtype=np.uint64)
+
+    filters = [
+        cls(expected_items, false_positive_rate)
+        for expected_items in sizes
+        for cls in (BloomFilter, BlockedBloomFilter)
+    ]
+    for bloom in filters:
+        bloom._add_digests(h1[::2], h2[::2])  # half the lookups are hits
+        bloom._check_digests(h1[:1000], h2[:1000])  # warm up
+        start = time.perf_counter()
+        bloom._check_digests(h1, h2)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{type(bloom).__name__:20s} {bloom.size / 8 / 2**20:8.1f} MiB  k={bloom.k:2d}  "
+            f"{elapsed / num_lookups * 1e9:7.1f} ns/lookup"
+        )
+
+
+if __name__ == "__main__":
+    bbf = BlockedBloomFilter(expected_items=100, false_positive_rate=0.01)
+    print(bbf.num_blocks, bbf.k, f"{blocked_fpr(bbf.size, bbf.n, bbf.k):.4f}")
+
+    bbf.add("apple")
+    bbf.add_many(["banana", "kiwi"])
+
+    print(bbf.check("apple"), bbf.check("cherry"))
+    print(bbf.check_many(["banana", "kiwi", "grape"]))
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -1,22 +1,41 @@
 """Bloom Filter Implementation."""
-import hashlib
 import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
 import bitarray
+import numpy as np
+
+from hashing import Hasher, double_hash_many
+
+# On-disk layout: a 64-byte little-endian header followed by the raw bytes
+# of the big-endian bit array.
+# magic, version, k, m, expected_items, false_positive_rate, count, seed, backend
+_HEADER = struct.Struct("<4sHHQQdQQ16s")
+_MAGIC = b"BLMF"
+_VERSION = 1
 
 class BloomFilter:
     """Bloom Filter Implementation."""
 
-    def __init__(self, expected_items: int, false_positive_rate: float):
+    def __init__(self, expected_items: int, false_positive_rate: float, hasher: Hasher | None = None):
         """Initialize the Bloom Filter."""
         self.n = expected_items
         self.p = false_positive_rate
+        self.hasher = hasher or Hasher()
 
         self.size = self._get_size(self.n, self.p)
         self.k = self._get_hash_count(self.size, self.n)
+        self.count = 0  # items added, duplicates included
+        self._mmap = None
 
         # self.bit_array = [0] * self.size
         # self.hash_functions = [self.hash_function1, self.hash_function2]
-        self.bit_array = bitarray.bitarray(self.size)
+        self.bit_array = bitarray.bitarray(self.size, endian="big")
         self.bit_array.setall(0)
 
     # We are using this formula to calculate the size of optimal size of the bit array.
@@ -34,24 +53,159 @@ class BloomFilter:
         return int(k)
     
     def _hashes(self, item: str | int) -> list[int]:
-        """Generate hash functions."""
-        hashes = []
-        item = item.encode("utf-8")
-        for i in range(self.k):
-            digest = hashlib.md5(item + str(i).encode()).hexdigest()
-            hash_val = int(digest, 16) % self.size
-            hashes.append(hash_val)
-        return hashes
+        """Generate the k bit positions from a single hash of the item."""
+        return self.hasher.indices(item, self.k, self.size)
     
     def add(self, item: str | int):
         """Add an item to the Bloom Filter."""
         hashes = self._hashes(item)
         for hash_val in hashes:
             self.bit_array[hash_val] = 1
+        self.count += 1
 
     def check(self, item: str | int) -> bool:
         """Check if an item is in the Bloom Filter."""
         return all(self.bit_array[hash_val] for hash_val in self._hashes(item))
+
+    # The batch methods work on the raw bytes of the big-endian bitarray:
+    # bit i lives in byte i >> 3 under the mask 0x80 >> (i & 7).
+    def _probe_bytes_and_masks(self, h1: np.ndarray, h2: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Byte offsets and bit masks for every probe of every hashed item."""
+        idx = double_hash_many(h1, h2, self.k, self.size)
+        masks = (np.uint8(0x80) >> (idx & np.uint64(7)).astype(np.uint8))
+        return idx >> np.uint64(3), masks
+
+    def add_many(self, items) -> None:
+        """Add a batch of items, setting all their bits in one vectorized pass."""
+        items = list(items)
+        if not items:
+            return
+        self._add_digests(*self.hasher.hash128_many(items))
+
+    def _add_digests(self, h1: np.ndarray, h2: np.ndarray) -> None:
+        if self.bit_array.readonly:
+            raise TypeError("cannot modify read-only memory")
+        offsets, masks = self._probe_bytes_and_masks(h1, h2)
+        buffer = np.frombuffer(self.bit_array, dtype=np.uint8)
+        np.bitwise_or.at(buffer, offsets.ravel(), masks.ravel())
+        self.count += len(h1)
+
+    def check_many(self, items) -> np.ndarray:
+        """Check a batch of items, returns a bool array in input order."""
+        items = list(items)
+        if not items:
+            return np.zeros(0, dtype=bool)
+        return self._check_digests(*self.hasher.hash128_many(items))
+
+    def _check_digests(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        offsets, masks = self._probe_bytes_and_masks(h1, h2)
+        buffer = np.frombuffer(self.bit_array, dtype=np.uint8)
+        return ((buffer[offsets] & masks) != 0).all(axis=1)
+
+    def merge(self, other: "BloomFilter") -> "BloomFilter":
+        """OR another filter into this one, giving the filter of the union."""
+        if (self.size, self.k, self.hasher) != (other.size, other.k, other.hasher):
+            raise ValueError("Cannot merge Bloom filters with different size, k or hash scheme.")
+        nbytes = (self.size + 7) // 8
+        ours = np.frombuffer(self.bit_array, dtype=np.uint8)[:nbytes]
+        theirs = np.frombuffer(other.bit_array, dtype=np.uint8)[:nbytes]
+        np.bitwise_or(ours, theirs, out=ours)
+        self.count += other.count
+        return self
+
+    __ior__ = merge
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(
+            _MAGIC, _VERSION, self.k, self.size, self.n, self.p,
+            self.count, self.hasher.seed, self.hasher.backend.encode(),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the filter to disk: header followed by the raw bit array."""
+        nbytes = (self.size + 7) // 8
+        with open(path, "wb") as f:
+            f.write(self._header())
+            f.write(memoryview(self.bit_array)[:nbytes])
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> "BloomFilter":
+        """Memory-map a saved filter, no bits are read or copied up front.
+
+        Read-only maps let any number of processes share one copy of the
+        filter through the page cache. A writable map writes bits straight
+        into the file; call ``flush`` (or ``close``) to persist the count.
+        """
+        with open(path, "r+b" if writable else "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+        magic, version, k, size, n, p, count, seed, backend = _HEADER.unpack_from(mm)
+        if magic != _MAGIC or version != _VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a version {_VERSION} Bloom filter file.")
+
+        bloom = cls.__new__(cls)
+        bloom.n = n
+        bloom.p = p
+        bloom.hasher = Hasher(backend.rstrip(b"\0").decode(), seed)
+        bloom.size = size
+        bloom.k = k
+        bloom.count = count
+        bloom._mmap = mm
+        bloom._view = memoryview(mm)[_HEADER.size:_HEADER.size + (size + 7) // 8]
+        bloom.bit_array = bitarray.bitarray(buffer=bloom._view, endian="big")
+        return bloom
+
+    def flush(self) -> None:
+        """Write the header and dirty pages of a writable mapping to disk."""
+        if self._mmap is not None and not self.bit_array.readonly:
+            self._mmap[:_HEADER.size] = self._header()
+            self._mmap.flush()
+
+    def close(self) -> None:
+        """Flush and unmap a filter returned by ``open``."""
+        if self._mmap is None:
+            return
+        self.flush()
+        # Every export of the mapping has to go before it can be closed.
+        self.bit_array = None
+        self._view.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self) -> "BloomFilter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def benchmark(num_items: int = 200_000, false_positive_rate: float = 0.01) -> None:
+    """Compare items/sec of the scalar loop against add_many / check_many."""
+    items = [f"key-{i}" for i in range(num_items)]
+
+    scalar = BloomFilter(num_items, false_positive_rate)
+    start = time.perf_counter()
+    for item in items:
+        scalar.add(item)
+    add_scalar = time.perf_counter() - start
+    start = time.perf_counter()
+    for item in items:
+        scalar.check(item)
+    check_scalar = time.perf_counter() - start
+
+    batch = BloomFilter(num_items, false_positive_rate)
+    start = time.perf_counter()
+    batch.add_many(items)
+    add_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    batch.check_many(items)
+    check_batch = time.perf_counter() - start
+
+    assert scalar.bit_array == batch.bit_array
+    print(f"{num_items} items, m={batch.size}, k={batch.k}")
+    print(f"add    scalar: {num_items / add_scalar:12,.0f} items/s   add_many:   {num_items / add_batch:12,.0f} items/s")
+    print(f"check  scalar: {num_items / check_scalar:12,.0f} items/s   check_many: {num_items / check_batch:12,.0f} items/s")
     
 
 if __name__ == "__main__":
@@ -71,3 +225,14 @@ if __name__ == "__main__":
 
     print(bloom.check("cherry"))
     print(bloom.check("grape")) # Possibly False ( Maybe True )
+
+    bloom.add_many(["kiwi", "mango"])
+    print(bloom.check_many(["kiwi", "mango", "papaya"]))
+
+    path = os.path.join(tempfile.gettempdir(), "bloom.bin")
+    bloom.save(path)
+    with BloomFilter.open(path) as shared:
+        print(shared.count, shared.check("apple"), shared.check("cherry"))
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,246 @@
+"""Thread-safe Cuckoo Filter with lock-striped buckets."""
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from cuckoo_filter import _FP_TYPES, CuckooFilter
+from hashing import Hasher
+
+
+class ConcurrentCuckooFilter(CuckooFilter):
+    """Cuckoo filter that many threads can read while another one writes.
+
+    Buckets map onto `num_stripes` locks. A reader holds the stripes of both
+    of its item's buckets, and every fingerprint move holds the stripes of
+    its source and destination buckets, so a move is atomic to any reader
+    that could be looking for it.
+
+    Writers are serialized among themselves. An insert that needs
+    displacements first searches for a whole cuckoo path (breadth first,
+    read only) and then applies it back to front: the last fingerprint
+    moves into the free slot, the one before it into the vacated slot, and
+    so on. No fingerprint is ever out of the table mid-kick.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        bucket_size: int = 4,
+        fp_size: int = 16,
+        max_kicks: int = 500,
+        num_stripes: int = 64,
+        hasher: Hasher | None = None,
+        grow_load: float = 0.5,
+        max_tables: int = 8,
+    ):
+        """Initialize the Concurrent Cuckoo Filter."""
+        self.num_stripes = num_stripes
+        self._locks = [threading.Lock() for _ in range(num_stripes)]
+        self._writer = threading.Lock()
+        super().__init__(size, bucket_size, fp_size, max_kicks, hasher, grow_load, max_tables)
+
+    def _stripes(self, *buckets: int) -> list[threading.Lock]:
+        """Locks guarding the buckets, in a global order to avoid deadlock."""
+        return [self._locks[s] for s in sorted({b % self.num_stripes for b in buckets})]
+
+    def _locked(self, *buckets: int):
+        return _MultiLock(self._stripes(*buckets))
+
+    def lookup(self, item: str | int) -> bool:
+        """Lookup item in Cuckoo Filter."""
+        h = self._cuckoo_hash(item)
+        for table in reversed(list(self.tables)):
+            fp = self._fingerprint(h, table)
+            mask = self._num_buckets(table) - 1
+            index1 = h & mask
+            index2 = self._index2(index1, fp, mask)
+            with self._locked(index1, index2):
+                if self._contains(table, index1, fp) or self._contains(table, index2, fp):
+                    return True
+        return False
+
+    def lookup_many(self, items) -> np.ndarray:
+        """Lookup a batch of items, taking each stripe lock once per table.
+
+        All stripes the batch touches are acquired together (in order), the
+        batch is checked in one vectorized pass, then they are released.
+        """
+        items = list(items)
+        found = np.zeros(len(items), dtype=bool)
+        if not items:
+            return found
+        h = self.hasher.hash128_many(items)[0]
+
+        for table in reversed(list(self.tables)):
+            fp, mixed = self._fingerprints_many(h, table)
+            dtype = _FP_TYPES[self._fp_bits(table)][1]
+            fps = fp.astype(dtype)[:, None]
+            num_buckets = self._num_buckets(table)
+            mask = np.uint64(num_buckets - 1)
+            index1 = h & mask
+            index2 = (index1 ^ mixed) & mask
+            stripes = np.unique(np.concatenate([index1, index2]) % np.uint64(self.num_stripes))
+            buckets = np.frombuffer(table, dtype=dtype).reshape(num_buckets, self.bucket_size)
+            with _MultiLock([self._locks[s] for s in stripes.tolist()]):
+                found |= (buckets[index1] == fps).any(axis=1) | (buckets[index2] == fps).any(axis=1)
+        return found
+
+    def insert(self, item: str | int) -> bool:
+        """Insert item into Cuckoo Filter, growing the filter if it is full.
+
+        Returns False if the item could not be stored, as CuckooFilter does.
+        """
+        h = self._cuckoo_hash(item)
+        with self._writer:
+            for table in reversed(self.tables):
+                fp = self._fingerprint(h, table)
+                mask = self._num_buckets(table) - 1
+                index1 = h & mask
+                for i in (index1, self._index2(index1, fp, mask)):
+                    with self._locked(i):
+                        if self._place(table, i, fp):
+                            self.count += 1
+                            return True
+
+            table = self.tables[-1]
+            fp = self._fingerprint(h, table)
+            mask = self._num_buckets(table) - 1
+            path = self._find_path(table, h & mask, self._index2(h & mask, fp, mask), mask)
+            if path is None:
+                if not self._can_grow(h):
+                    return False
+                self._grow()
+                table = self.tables[-1]
+                fp = self._fingerprint(h, table)  # the new table has wider fingerprints
+                path = [(h & (self._num_buckets(table) - 1), None)]
+            self._apply_path(table, path, fp, mask)
+            self.count += 1
+            return True
+
+    def _find_path(self, table, index1: int, index2: int, mask: int):
+        """Breadth-first search for a chain of moves that frees a slot.
+
+        Returns [(bucket, slot), ..., (bucket, None)]: the fingerprint in each
+        (bucket, slot) moves to the next bucket, whose free slot ends the
+        chain. Only the writer changes the table, so what we read stays true
+        until the path is applied.
+        """
+        queue = deque([[(index1, None)], [(index2, None)]])
+        seen = {index1, index2}
+        explored = 0
+        while queue and explored < self.max_kicks:
+            path = queue.popleft()
+            bucket = path[-1][0]
+            start = bucket * self.bucket_size
+            for slot in range(start, start + self.bucket_size):
+                explored += 1
+                alt = self._index2(bucket, table[slot], mask)
+                if alt in seen:
+                    continue
+                seen.add(alt)
+                new_path = path[:-1] + [(bucket, slot), (alt, None)]
+                if 0 in table[alt * self.bucket_size:(alt + 1) * self.bucket_size]:
+                    return new_path
+                queue.append(new_path)
+        return None
+
+    def _apply_path(self, table, path, fp: int, mask: int) -> None:
+        """Shift fingerprints along the path from the free end backwards."""
+        for (src, slot), (dst, _) in zip(reversed(path[:-1]), reversed(path[1:])):
+            with self._locked(src, dst):
+                self._place(table, dst, table[slot])
+                table[slot] = 0
+        with self._locked(path[0][0]):
+            self._place(table, path[0][0], fp)
+
+    def delete(self, item: str | int) -> bool:
+        """Delete item from Cuckoo Filter."""
+        h = self._cuckoo_hash(item)
+        with self._writer:
+            for table in reversed(self.tables):
+                fp = self._fingerprint(h, table)
+                mask = self._num_buckets(table) - 1
+                index1 = h & mask
+                for i in [index1, self._index2(index1, fp, mask)]:
+                    start = i * self.bucket_size
+                    with self._locked(i):
+                        for slot in range(start, start + self.bucket_size):
+                            if table[slot] == fp:
+                                table[slot] = 0
+                                self.count -= 1
+                                return True
+        return False
+
+
+class _MultiLock:
+    """Acquire a list of locks in order, release them in reverse."""
+
+    def __init__(self, locks: list[threading.Lock]):
+        self.locks = locks
+
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc):
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+def benchmark(thread_counts=(1, 2, 4, 8), num_items: int = 200_000, batch_size: int = 1000, seconds: float = 2.0) -> None:
+    """Lookup throughput with N reader threads and one background writer."""
+    keys = [f"key-{i}" for i in range(num_items)]
+    for threads in thread_counts:
+        cf = ConcurrentCuckooFilter(size=num_items // 4)
+        for key in keys[:num_items // 2]:
+            cf.insert(key)
+
+        stop = threading.Event()
+        lookups = [0] * threads
+        missing = []
+
+        def reader(n: int) -> None:
+            i = 0
+            while not stop.is_set():
+                batch = keys[i:i + batch_size]
+                found = cf.lookup_many(batch)
+                if not found[: max(0, num_items // 2 - i)].all():
+                    missing.append(n)  # an already inserted key went missing
+                lookups[n] += len(batch)
+                i = (i + batch_size) % (num_items // 2)
+
+        def writer() -> None:
+            for key in keys[num_items // 2:]:
+                if stop.is_set():
+                    break
+                cf.insert(key)
+
+        workers = [threading.Thread(target=reader, args=(n,)) for n in range(threads)]
+        workers.append(threading.Thread(target=writer))
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+        print(
+            f"{threads} reader thread(s): {sum(lookups) / seconds:12,.0f} lookups/s, "
+            f"{cf.count - num_items // 2} concurrent inserts, consistent: {not missing}"
+        )
+
+
+if __name__ == "__main__":
+    cf = ConcurrentCuckooFilter(size=64, bucket_size=4)
+
+    for word in ['dog', 'cat', 'fish', 'horse']:
+        cf.insert(word)
+
+    print(cf.lookup('dog'), cf.lookup('bird'))
+    print(cf.lookup_many(['cat', 'fish', 'bird']))
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,320 @@
+"""Thread-safe skip list: lock-free reads, per-node locks for writes.
+
+This is the lazy skip list of Herlihy, Lev, Luchangco and Shavit (2007).
+Searches never take a lock. Writers lock only the predecessor nodes whose
+links they change, validate that nothing moved underneath them, and then
+link or unlink bottom-up or top-down so a reader always walks a
+well-formed list. A node only counts as present once it is fully linked,
+and it is logically deleted (marked) before it is unlinked.
+
+Values form a set: inserting a value that is already present returns
+False.
+"""
+import random
+import sys
+import threading
+import time
+
+
+class ConcurrentSkipListNode:
+
+    __slots__ = ("value", "forward", "lock", "marked", "fully_linked", "top_level")
+
+    def __init__(self, value: int, level: int):
+        self.value = value
+        self.forward = [None] * (level + 1)
+        self.lock = threading.Lock()
+        self.marked = False  # logically deleted
+        self.fully_linked = False  # linked at every level
+        self.top_level = level
+
+
+class ConcurrentSkipList:
+    """Skip list that many threads can search while others insert and delete."""
+
+    MAX_LEVEL = 32
+    P = 0.5 # Probability for level increase
+
+    def __init__(self):
+        self.head = ConcurrentSkipListNode(value=None, level=self.MAX_LEVEL)
+        self.level = 0  # highest level ever used, only grows
+        self._length = 0
+        self._counter_lock = threading.Lock()  # guards level and _length
+
+    def _random_level(self):
+        lvl = 0
+        while random.random() < self.P and lvl < self.MAX_LEVEL:
+            lvl += 1
+        return lvl
+
+    def _find(self, value: int, preds: list, succs: list, top: int) -> int:
+        """Fill preds/succs for levels 0..top, return the highest level holding value or -1."""
+        found = -1
+        pred = self.head
+        for i in reversed(range(top + 1)):
+            current = pred.forward[i]
+            while current is not None and current.value < value:
+                pred = current
+                current = pred.forward[i]
+            if found == -1 and current is not None and current.value == value:
+                found = i
+            preds[i] = pred
+            succs[i] = current
+        return found
+
+    def search(self, value: int) -> bool:
+        """Lock-free membership test."""
+        pred = self.head
+        for i in reversed(range(self.level + 1)):
+            current = pred.forward[i]
+            while current is not None and current.value < value:
+                pred = current
+                current = pred.forward[i]
+            if current is not None and current.value == value:
+                return current.fully_linked and not current.marked
+        return False
+
+    __contains__ = search
+
+    @staticmethod
+    def _lock_preds(preds: list, top: int, is_valid) -> tuple[list, bool]:
+        """Lock each distinct predecessor bottom-up while is_valid(level) holds."""
+        locked = []
+        previous = None
+        for i in range(top + 1):
+            pred = preds[i]
+            if pred is not previous:  # equal preds sit on consecutive levels
+                pred.lock.acquire()
+                locked.append(pred)
+                previous = pred
+            if not is_valid(i):
+                return locked, False
+        return locked, True
+
+    @staticmethod
+    def _unlock(nodes: list) -> None:
+        for node in reversed(nodes):
+            node.lock.release()
+
+    def insert(self, value: int) -> bool:
+        """Insert value, returns False if it is already present."""
+        top = self._random_level()
+        preds = [None] * (self.MAX_LEVEL + 1)
+        succs = [None] * (self.MAX_LEVEL + 1)
+        while True:
+            found = self._find(value, preds, succs, max(top, self.level))
+            if found != -1:
+                existing = succs[found]
+                if not existing.marked:
+                    while not existing.fully_linked:  # another insert is mid-link
+                        time.sleep(0)
+                    return False
+                continue  # being deleted, retry once it is gone
+
+            def is_valid(i):
+                pred, succ = preds[i], succs[i]
+                return not pred.marked and (succ is None or not succ.marked) and pred.forward[i] is succ
+
+            locked, valid = self._lock_preds(preds, top, is_valid)
+            if not valid:
+                self._unlock(locked)
+                continue
+
+            new_node = ConcurrentSkipListNode(value=value, level=top)
+            for i in range(top + 1):
+                new_node.forward[i] = succs[i]
+            for i in range(top + 1):  # bottom-up, so readers see it at level 0 first
+                preds[i].forward[i] = new_node
+            with self._counter_lock:
+                self.level = max(self.level, top)  # raised before the node counts as present
+                self._length += 1
+            new_node.fully_linked = True
+            self._unlock(locked)
+            return True
+
+    def delete(self, value: int) -> bool:
+        """Delete value, returns False if it is absent."""
+        preds = [None] * (self.MAX_LEVEL + 1)
+        succs = [None] * (self.MAX_LEVEL + 1)
+        victim = None
+        while True:
+            # Search every level, as Herlihy et al. do, so found always
+            # reaches the victim's top level whatever self.level reads.
+            found = self._find(value, preds, succs, self.MAX_LEVEL)
+            if victim is None:
+                if found == -1:
+                    return False
+                candidate = succs[found]
+                if not (candidate.fully_linked and candidate.top_level == found and not candidate.marked):
+                    return False
+                candidate.lock.acquire()
+                if candidate.marked:
+                    candidate.lock.release()
+                    return False
+                candidate.marked = True  # logically deleted from here on
+                victim = candidate
+
+            top = victim.top_level
+
+            def is_valid(i):
+                pred = preds[i]
+                return not pred.marked and pred.forward[i] is victim
+
+            locked, valid = self._lock_preds(preds, top, is_valid)
+            if not valid:
+                self._unlock(locked)
+                continue
+
+            for i in reversed(range(top + 1)):  # top-down
+                preds[i].forward[i] = victim.forward[i]
+            victim.lock.release()
+            self._unlock(locked)
+            with self._counter_lock:
+                self._length -= 1
+            return True
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        """Weakly consistent, lock-free in-order iteration."""
+        node = self.head.forward[0]
+        while node is not None:
+            if node.fully_linked and not node.marked:
+                yield node.value
+            node = node.forward[0]
+
+
+def stress_test(num_threads: int = 8, ops_per_thread: int = 20_000, seed: int = 0) -> None:
+    """Hammer one list from many threads and check it against a model.
+
+    Each writer owns a disjoint key range so its own model is exact, while
+    readers keep checking a set of keys that are never deleted. A second
+    phase has all writers racing inserts and deletes on a few shared keys.
+    """
+    skiplist = ConcurrentSkipList()
+    stable = list(range(0, 10_000, 10))
+    for value in stable:
+        skiplist.insert(value)
+
+    models = [set() for _ in range(num_threads)]
+    errors = []
+    stop = threading.Event()
+
+    def writer(n: int) -> None:
+        rng = random.Random(seed + n)
+        model = models[n]
+        for _ in range(ops_per_thread):
+            value = 100_000 + rng.randrange(2000) * num_threads + n
+            if rng.random() < 0.6:
+                if skiplist.insert(value) != (value not in model):
+                    errors.append(("insert", value))
+                model.add(value)
+            else:
+                if skiplist.delete(value) != (value in model):
+                    errors.append(("delete", value))
+                model.discard(value)
+
+    def reader() -> None:
+        rng = random.Random(seed)
+        while not stop.is_set():
+            value = rng.choice(stable)
+            if not skiplist.search(value):
+                errors.append(("search", value))
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(num_threads)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    expected = sorted(set(stable).union(*models))
+    assert not errors, errors[:10]
+    assert list(skiplist) == expected, "contents diverged from the model"
+    assert len(skiplist) == len(expected)
+    print(f"stress test passed: {num_threads} writers, {len(expected)} values")
+
+    # Contended phase: every writer inserts and deletes the same few keys,
+    # so inserts and deletes race on one value. Per value, successful
+    # inserts minus successful deletes must be 1 if it ended up present
+    # and 0 if not.
+    shared = 32
+    net = [[0] * shared for _ in range(num_threads)]
+
+    def contender(n: int) -> None:
+        rng = random.Random(seed + 1000 + n)
+        counts = net[n]
+        for _ in range(ops_per_thread):
+            value = rng.randrange(shared)
+            if rng.random() < 0.5:
+                counts[value] += skiplist.insert(-1 - value)
+            else:
+                counts[value] -= skiplist.delete(-1 - value)
+
+    contenders = [threading.Thread(target=contender, args=(n,)) for n in range(num_threads)]
+    for thread in contenders:
+        thread.start()
+    for thread in contenders:
+        thread.join()
+
+    for value in range(shared):
+        present = skiplist.search(-1 - value)
+        assert sum(counts[value] for counts in net) == present, f"lost update on {-1 - value}"
+    contents = list(skiplist)
+    assert contents == sorted(set(contents)) and len(contents) == len(skiplist)
+    assert contents[len(contents) - len(expected):] == expected
+    print(f"contended stress test passed: {num_threads} writers on {shared} shared keys")
+
+
+def benchmark(thread_counts=(1, 2, 4, 8), read_ratio: float = 0.9, seconds: float = 2.0, size: int = 100_000) -> None:
+    """Mixed read/write throughput at several thread counts."""
+    for threads in thread_counts:
+        skiplist = ConcurrentSkipList()
+        for value in random.sample(range(size * 2), size):
+            skiplist.insert(value)
+
+        stop = threading.Event()
+        ops = [0] * threads
+
+        def worker(n: int) -> None:
+            rng = random.Random(n)
+            done = 0
+            while not stop.is_set():
+                value = rng.randrange(size * 2)
+                roll = rng.random()
+                if roll < read_ratio:
+                    skiplist.search(value)
+                elif roll < (1 + read_ratio) / 2:
+                    skiplist.insert(value)
+                else:
+                    skiplist.delete(value)
+                done += 1
+            ops[n] = done
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in workers:
+            thread.join()
+        print(f"{threads} thread(s), {read_ratio:.0%} reads: {sum(ops) / seconds:12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    s = ConcurrentSkipList()
+    for val in [3, 6, 7, 9, 12, 19, 17, 26, 21, 25]:
+        s.insert(val)
+
+    print("Search 19:", s.search(19))  # True
+    print("Search 15:", s.search(15))    # False
+    print("Delete 19:", s.delete(19), list(s))
+
+    stress_test()
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -1,19 +1,112 @@
-import hashlib
 import math
+import sys
+
+import numpy as np
+
+from hashing import Hasher
+
+
+class PackedCounterArray:
+    """Fixed-width saturating counters packed several to a byte.
+
+    A counter that reaches ``max_value`` sticks there: its true count is no
+    longer known, so it is never decremented again. Counters therefore never
+    wrap around and never produce a false negative.
+    """
+
+    def __init__(self, size: int, counter_bits: int = 4):
+        """Initialize `size` zeroed counters of `counter_bits` bits each."""
+        if counter_bits not in (1, 2, 4, 8):
+            raise ValueError("counter_bits must be 1, 2, 4 or 8.")
+        self.size = size
+        self.counter_bits = counter_bits
+        self.max_value = (1 << counter_bits) - 1
+        self.per_byte = 8 // counter_bits
+
+        # bytearray for fast scalar access, NumPy view of it for batches
+        self.data = bytearray(math.ceil(size / self.per_byte))
+        self._view = np.frombuffer(self.data, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, idx: int) -> int:
+        byte, slot = divmod(idx, self.per_byte)
+        return (self.data[byte] >> (slot * self.counter_bits)) & self.max_value
+
+    def increment(self, idx: int) -> None:
+        """Add one to a counter unless it is saturated."""
+        byte, slot = divmod(idx, self.per_byte)
+        shift = slot * self.counter_bits
+        if (self.data[byte] >> shift) & self.max_value != self.max_value:
+            self.data[byte] += 1 << shift
+
+    def decrement(self, idx: int) -> None:
+        """Subtract one from a non-zero counter unless it is saturated."""
+        byte, slot = divmod(idx, self.per_byte)
+        shift = slot * self.counter_bits
+        value = (self.data[byte] >> shift) & self.max_value
+        if 0 < value < self.max_value:
+            self.data[byte] -= 1 << shift
+
+    def get_many(self, idx: np.ndarray) -> np.ndarray:
+        """Counter values at an array of indices."""
+        byte, shift = self._locate(idx)
+        return (self._view[byte] >> shift) & np.uint8(self.max_value)
+
+    def add_many(self, idx: np.ndarray, sign: int = 1) -> None:
+        """Increment (or with sign=-1 decrement) the counters at `idx`.
+
+        Repeated indices count once per occurrence. A decrement that would
+        take an unsaturated counter below zero raises ValueError before any
+        counter is changed.
+        """
+        idx, times = np.unique(idx, return_counts=True)
+        current = self.get_many(idx).astype(np.int64)
+        if sign > 0:
+            new = np.minimum(current + times, self.max_value)
+        else:
+            saturated = current == self.max_value
+            if not (saturated | (current >= times)).all():
+                raise ValueError("Cannot decrement a counter below zero.")
+            new = np.where(saturated, current, current - times)
+
+        byte, shift = self._locate(idx)
+        # Several counters can share a byte, ufunc.at applies every update.
+        np.bitwise_and.at(self._view, byte, ~(np.uint8(self.max_value) << shift))
+        np.bitwise_or.at(self._view, byte, new.astype(np.uint8) << shift)
+
+    def _locate(self, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        idx = np.asarray(idx, dtype=np.int64)
+        shift = (idx % self.per_byte) * self.counter_bits
+        return idx // self.per_byte, shift.astype(np.uint8)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
 
 
 class CountingBloomFilter:
     """Counting Bloom Filter Implementation."""
 
-    def __init__(self, expected_items: int, false_positive_rate: float):
+    def __init__(
+        self,
+        expected_items: int,
+        false_positive_rate: float,
+        hasher: Hasher | None = None,
+        counter_bits: int = 4,
+    ):
         """Initialize the Counting Bloom Filter."""
         self.n = expected_items
         self.p = false_positive_rate
+        self.hasher = hasher or Hasher()
 
         self.size = self._get_size(self.n, self.p)
         self.k = self._get_hash_count(self.size, self.n)
 
-        self.counter_array = [0] * self.size
+        # 4 bits overflow only with probability ~1e-15 per counter at the
+        # optimal load (Fan et al., Summary Cache).
+        self.counter_array = PackedCounterArray(self.size, counter_bits)
 
     def _get_size(self, expected_items: int, false_positive_rate: float) -> int:
         """Calculate the size of the bit array m."""
@@ -26,18 +119,14 @@ class CountingBloomFilter:
         return int(k)
     
     def _hashes(self, item: str | int) -> list[int]:
-        """Generate hash functions."""
-        item = item.encode("utf-8")
-        return [
-            int(hashlib.md5(item + str(i).encode()).hexdigest(), 16) % self.size
-            for i in range(self.k)
-        ]
+        """Generate the k counter positions from a single hash of the item."""
+        return self.hasher.indices(item, self.k, self.size)
     
     def add(self, item: str | int) -> None:
         """Add an item to the Counting Bloom Filter."""
         hashes = self._hashes(item)
         for hash_val in hashes:
-            self.counter_array[hash_val] += 1
+            self.counter_array.increment(hash_val)
 
     def remove(self, item: str | int) -> None:
         """Remove an item from the Counting Bloom Filter."""
@@ -45,13 +134,55 @@ class CountingBloomFilter:
             raise ValueError("Item not found in the Counting Bloom Filter.")
         
         for idx in self._hashes(item):
-            self.counter_array[idx] -= 1
-            
+            self.counter_array.decrement(idx)
 
     def check(self, item: str | int) -> bool:
         """Check if an item is in the Counting Bloom Filter."""
         return all(self.counter_array[hash_val] > 0 for hash_val in self._hashes(item))
-    
+
+    def add_many(self, items) -> None:
+        """Add a batch of items."""
+        items = list(items)
+        if items:
+            self.counter_array.add_many(self.hasher.indices_many(items, self.k, self.size).ravel())
+
+    def remove_many(self, items) -> None:
+        """Remove a batch of items, all of which must be present.
+
+        Like calling remove once per item: a counter must hold at least as
+        many items as the batch takes from it, else nothing is removed.
+        """
+        items = list(items)
+        if not items:
+            return
+        idx = self.hasher.indices_many(items, self.k, self.size)
+        try:
+            self.counter_array.add_many(idx.ravel(), sign=-1)
+        except ValueError:
+            raise ValueError("Item not found in the Counting Bloom Filter.") from None
+
+    def check_many(self, items) -> np.ndarray:
+        """Check a batch of items, returns a bool array in input order."""
+        items = list(items)
+        if not items:
+            return np.zeros(0, dtype=bool)
+        idx = self.hasher.indices_many(items, self.k, self.size)
+        return (self.counter_array.get_many(idx) > 0).all(axis=1)
+
+    def memory_report(self) -> dict:
+        """Bytes used by the packed counters next to a list of Python ints."""
+        packed = self.counter_array.nbytes
+        # A list holds one pointer per counter, before any int objects past 256.
+        as_list = sys.getsizeof([]) + self.size * 8
+        return {
+            "counters": self.size,
+            "counter_bits": self.counter_array.counter_bits,
+            "packed_bytes": packed,
+            "list_bytes": as_list,
+            "bytes_per_item": packed / self.n,
+            "saving": as_list / packed,
+        }
+
 
 if __name__ == "__main__":
     """Implemenation of Counting Bloom Filter."""
@@ -74,4 +205,10 @@ if __name__ == "__main__":
         cbf.remove("apple")
     except ValueError as e:
         print(e)
+
+    cbf.add_many(["kiwi", "kiwi", "mango"])
+    cbf.remove_many(["kiwi"])
+    print(cbf.check_many(["kiwi", "mango", "apple"]))
+
+    print(CountingBloomFilter(expected_items=1_000_000, false_positive_rate=0.01).memory_report())
     
\ No newline at end of file
@@ -1,36 +1,152 @@
-import hashlib
+import numpy as np
+
+from hashing import Hasher, double_hash_many
+
+_LOW32 = np.uint64(0xFFFFFFFF)
+
+
+def _saturating_add(a: np.ndarray, b: np.ndarray, cap: int) -> np.ndarray:
+    """a + b in uint64, stuck at cap instead of wrapping (a, b <= cap)."""
+    a = a.astype(np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    cap = np.uint64(cap)
+    return np.where(a > cap - b, cap, a + b)
+
+
+def _saturating_sums(groups: np.ndarray, counts: np.ndarray, num_groups: int, cap: int) -> np.ndarray:
+    """Per-group sums of uint64 counts, capped at cap.
+
+    Counts are summed as 32-bit halves so no partial sum can wrap, then
+    recombined with an overflow check.
+    """
+    low = np.zeros(num_groups, dtype=np.uint64)
+    high = np.zeros(num_groups, dtype=np.uint64)
+    np.add.at(low, groups, counts & _LOW32)
+    np.add.at(high, groups, counts >> np.uint64(32))
+    carry = high + (low >> np.uint64(32))
+    total = (carry << np.uint64(32)) | (low & _LOW32)
+    return np.where(carry > _LOW32, np.uint64(cap), np.minimum(total, np.uint64(cap)))
+
 
 class CountMinSketch:
+    """Count-Min Sketch with saturating counters.
+
+    A cell that reaches the dtype's maximum stays there instead of wrapping
+    to a small value, so an estimate never drops below the true count until
+    it reads as that maximum.
+    """
 
-    def __init__(self, width: int, depth: int, seed: int = 0):
+    def __init__(self, width: int, depth: int, seed: int = 0, dtype=np.uint64, conservative: bool = False):
         self.width = width
         self.depth = depth
         self.seed = seed
+        self.hasher = Hasher(seed=seed)
+        # Conservative update only raises a cell as far as the item's new
+        # estimate requires, which cuts overestimation at no memory cost.
+        self.conservative = conservative
+
+        # Fixed-width unsigned counters, uint32 halves memory for short streams.
+        self.table = np.zeros((depth, width), dtype=dtype)
+        if self.table.dtype.kind != "u":
+            raise ValueError("dtype must be an unsigned integer type.")
+        self._cap = int(np.iinfo(self.table.dtype).max)
+        self._rows = np.arange(depth)
+
+    def _hashes(self, item: str) -> list[int]:
+        """Column index of the item in every row, from a single hash."""
+        return self.hasher.indices(item, self.depth, self.width)
 
-        self.table = [[0] * width for _ in range(depth)]
+    def _check_counts(self, counts, n: int) -> np.ndarray:
+        """Validate per-item counts, returned as uint64 capped at the dtype max."""
+        if not isinstance(counts, np.ndarray):
+            try:
+                counts = np.asarray(counts, dtype=np.int64)
+            except OverflowError:  # Python ints past the int64 range
+                counts = np.asarray(counts, dtype=object)
+        if counts.shape != (n,):
+            raise ValueError("Need one count per item.")
+        if counts.dtype.kind not in "iuO":
+            raise ValueError("Counts must be integers.")
+        if n and (counts < 0).any():
+            raise ValueError("Counts cannot be negative.")
+        if counts.dtype.kind == "O":
+            return np.minimum(counts, self._cap).astype(np.uint64)
+        return np.minimum(counts.astype(np.uint64), np.uint64(self._cap))
 
-    def _hash(self, item: str, i: int) -> int:
-        """Hash function for item."""
-        h = hashlib.md5(f"{self.seed + i}_{item}".encode()).hexdigest()
-        return int(h, 16) % self.width
-    
     def add(self, item: str, count: int = 1):
         """Update the count for an item."""
-        for i in range(self.depth):
-            idx = self._hash(item, i)
-            self.table[i][idx] += count
+        if count < 0:
+            raise ValueError("Counts cannot be negative.")
+        count = min(count, self._cap)
+        cells = (self._rows, self._hashes(item))
+        if self.conservative:
+            target = _saturating_add(self.table[cells].min(), count, self._cap)
+            self.table[cells] = np.maximum(self.table[cells], target)
+        else:
+            self.table[cells] = _saturating_add(self.table[cells], count, self._cap)
 
     def estimate(self, item: str) -> int:
         """Estimate the count for an item."""
-        estimates = []
-        for i in range(self.depth):
-            idx = self._hash(item, i)
-            estimates.append(self.table[i][idx])
-        return min(estimates)
-    
+        return int(self.table[self._rows, self._hashes(item)].min())
+
+    def add_many(self, items, counts=None):
+        """Update the counts for a batch of items in one scatter-add."""
+        items = list(items)
+        if not items:
+            return
+        if counts is None:
+            counts = np.ones(len(items), dtype=np.uint64)
+        else:
+            counts = self._check_counts(counts, len(items))
+        h1, h2 = self.hasher.hash128_many(items)
+
+        if self.conservative:
+            # Sum repeated items first: two copies of one item must add up,
+            # not take the max. Then every item raises its cells to
+            # estimate + count using the estimates from before the batch,
+            # which keeps each cell an upper bound for every item in it.
+            h1, first, inverse = np.unique(h1, return_index=True, return_inverse=True)
+            h2 = h2[first]
+            counts = _saturating_sums(inverse.ravel(), counts, len(h1), self._cap)
+
+        cells = (self._rows, self._indices(h1, h2))
+        if self.conservative:
+            target = _saturating_add(self.table[cells].min(axis=1), counts, self._cap)
+            np.maximum.at(self.table, cells, target[:, None].astype(self.table.dtype))
+        else:
+            # Total each touched cell first, then add once with saturation.
+            flat = (cells[0] * self.width + cells[1]).ravel()
+            flat, inverse = np.unique(flat, return_inverse=True)
+            totals = _saturating_sums(inverse.ravel(), np.repeat(counts, self.depth), len(flat), self._cap)
+            table = self.table.reshape(-1)
+            table[flat] = _saturating_add(table[flat], totals, self._cap)
+
+    def estimate_many(self, items) -> np.ndarray:
+        """Estimate the counts for a batch of items."""
+        items = list(items)
+        if not items:
+            return np.zeros(0, dtype=self.table.dtype)
+        h1, h2 = self.hasher.hash128_many(items)
+        return self.table[self._rows, self._indices(h1, h2)].min(axis=1)
+
+    def _indices(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        """(n_items, depth) column indices, matching ``_hashes``."""
+        return double_hash_many(h1, h2, self.depth, self.width).astype(np.intp)
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Add another sketch's counters, giving the sketch of both streams."""
+        if (self.width, self.depth, self.hasher) != (other.width, other.depth, other.hasher):
+            raise ValueError("Cannot merge Count-Min Sketches with different shape or seed.")
+        if self.table.dtype != other.table.dtype:
+            raise ValueError("Cannot merge Count-Min Sketches with different counter dtypes.")
+        self.table[...] = _saturating_add(self.table, other.table, self._cap)
+        return self
+
+    __iadd__ = merge
+
     def __str__(self):
-        return "\n".join(f"Row {i+1}: {row}" for i, row in enumerate(self.table))
-    
+        return "\n".join(f"Row {i+1}: {row.tolist()}" for i, row in enumerate(self.table))
+
 if __name__ == "__main__":
     cms = CountMinSketch(width=20, depth=5)
     # print(cms)
@@ -44,4 +160,8 @@ if __name__ == "__main__":
 
     print("\nEstimated counts:")
     for item in ["apple", "banana", "orange", "grape"]:
-        print(f"{item}: {cms.estimate(item)}")
\ No newline at end of file
+        print(f"{item}: {cms.estimate(item)}")
+
+    batch = CountMinSketch(width=20, depth=5, conservative=True)
+    batch.add_many(data_stream)
+    print("\nConservative batch estimates:", batch.estimate_many(["apple", "banana", "orange", "grape"]))
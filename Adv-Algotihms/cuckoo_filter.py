@@ -1,104 +1,251 @@
-import hashlib
+import array
+import math
 import random
 
+import numpy as np
+
+from hashing import MASK64, Hasher
+
+# array typecode and NumPy dtype for each supported fingerprint width
+_FP_TYPES = {8: ("B", np.uint8), 16: ("H", np.uint16), 32: ("I", np.uint32)}
+
 class CuckooFilter:
-    """Cuckoo Filter Implementation."""
+    """Cuckoo Filter Implementation (Fan et al., 2014).
+
+    Each table is a flat array of `num_buckets * bucket_size` integer
+    fingerprints, 0 marking an empty slot. An item's two buckets are
+    i1 = hash & mask and i2 = i1 ^ hash(fp), so a fingerprint can always be
+    moved to its other bucket without knowing the original item.
+
+    Fingerprints alone cannot be rehashed into a bigger table, so when an
+    insert still fails after `max_kicks` displacements on a table that is
+    at least `grow_load` full, the filter grows by chaining a new table
+    twice the size of the last one, up to `max_tables`. A failure that
+    growing cannot fix (the table is not loaded yet, the item's two buckets
+    already hold nothing but its own fingerprint, or the cap is reached)
+    makes insert return False instead. Lookups check
+    every table, newest first, so every table adds to the false positive
+    rate. Each new table therefore uses the next wider fingerprint (8, 16,
+    then 32 bits), which keeps the compound rate converging; see
+    false_positive_bound.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        bucket_size: int = 4,
+        fp_size: int = 16,
+        max_kicks: int = 500,
+        hasher: Hasher | None = None,
+        grow_load: float = 0.5,
+        max_tables: int = 8,
+    ):
+        """Initialize the Cuckoo Filter.
 
-    def __init__(self, size: int, bucket_size: int, fp_size: int, max_kicks: int = 500):
-        """Initialize the Cuckoo Filter."""
-        self.size = size
+        `size` is rounded up to a power of two buckets and `fp_size` is the
+        fingerprint width in bits (8, 16 or 32) of the first table.
+        """
+        if fp_size not in _FP_TYPES:
+            raise ValueError(f"fp_size must be one of {sorted(_FP_TYPES)} bits.")
+        self.size = 1 << max(0, size - 1).bit_length()
         self.bucket_size = bucket_size
         self.fp_size = fp_size
         self.max_kicks = max_kicks
+        self.grow_load = grow_load
+        self.max_tables = max_tables
+        self.hasher = hasher or Hasher()
+        self.count = 0
+
+        self.tables = []
+        self._grow()
+
+    def _grow(self) -> None:
+        """Chain an empty table twice as large, with wider fingerprints."""
+        if self.tables:
+            newest = self._fp_bits(self.tables[-1])
+            fp_size = min((bits for bits in _FP_TYPES if bits > newest), default=newest)
+        else:
+            fp_size = self.fp_size
+        typecode, dtype = _FP_TYPES[fp_size]
+        num_buckets = self.size << len(self.tables)
+        self.tables.append(array.array(typecode, bytes(num_buckets * self.bucket_size * dtype().itemsize)))
+
+    def _num_buckets(self, table: array.array) -> int:
+        return len(table) // self.bucket_size
+
+    @staticmethod
+    def _fp_bits(table: array.array) -> int:
+        """Fingerprint width of a table, set by its array typecode."""
+        return table.itemsize * 8
+
+    def _can_grow(self, h: int) -> bool:
+        """Whether a failed insert on the newest table is down to real load.
 
-        self.buckets = [[] for _ in range(self.size)]
+        When the fingerprint already fills both of its buckets (the same key
+        inserted 2 * bucket_size times) a bigger table would not help.
+        """
+        if len(self.tables) >= self.max_tables:
+            return False
+        table = self.tables[-1]
+        fp = self._fingerprint(h, table)
+        mask = self._num_buckets(table) - 1
+        index1 = h & mask
+        buckets = {index1, self._index2(index1, fp, mask)}
+        if all(table[b * self.bucket_size + j] == fp for b in buckets for j in range(self.bucket_size)):
+            return False
+        used = np.count_nonzero(np.frombuffer(table, dtype=_FP_TYPES[self._fp_bits(table)][1]))
+        return used >= self.grow_load * len(table)
 
     def _cuckoo_hash(self, item: str | int) -> int:
         """Cuckoo Hash Function."""
-        return int(hashlib.md5(item.encode()).hexdigest(), 16)
-    
-    def _fingerprint(self, item: str | int) -> str:
-        """Generate fingerprint for item."""
-        h = self._cuckoo_hash(item)
-        return format(h, 'x')[:self.fp_size]
-    
-    def _index1(self, item: str | int) -> int:
-        """Generate index for item."""
-        h = self._cuckoo_hash(item)
-        return h % self.size
-    
-    def _index2(self, index1: int, fp: str) -> int:
-        """Generate index for item."""
-        h = self._cuckoo_hash(fp)
-        return (index1 ^ h) % self.size
-    
+        return self.hasher.hash64(item)
+
+    def _fingerprint(self, h: int, table: array.array) -> int:
+        """Top bits of the hash at the table's width, 0 is reserved for empty slots."""
+        return (h >> (64 - self._fp_bits(table))) or 1
+
+    def _fingerprints_many(self, h: np.ndarray, table: array.array) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized _fingerprint, plus the hash used by _index2."""
+        fp = h >> np.uint64(64 - self._fp_bits(table))
+        fp[fp == 0] = 1
+        return fp, (fp * np.uint64(0x5BD1E995)) >> np.uint64(16)
+
+    def _index2(self, index: int, fp: int, mask: int) -> int:
+        """The other bucket of a fingerprint sitting in bucket `index`."""
+        return (index ^ (((fp * 0x5BD1E995) & MASK64) >> 16)) & mask
+
+    def _place(self, table: array.array, bucket: int, fp: int) -> bool:
+        """Store fp in a free slot of the bucket, if it has one."""
+        start = bucket * self.bucket_size
+        for slot in range(start, start + self.bucket_size):
+            if table[slot] == 0:
+                table[slot] = fp
+                return True
+        return False
+
+    def _contains(self, table: array.array, bucket: int, fp: int) -> bool:
+        start = bucket * self.bucket_size
+        return fp in table[start:start + self.bucket_size]
+
     def insert(self, item: str | int) -> bool:
-        """Insert item into Cuckoo Filter."""
-        fp = self._fingerprint(item)
-        index1 = self._index1(item)
-        index2 = self._index2(index1, fp)
-
-        for i in [index1, index2]:
-            if len(self.buckets[i]) < self.bucket_size:
-                self.buckets[i].append(fp)
+        """Insert item into Cuckoo Filter, growing the filter if it is full.
+
+        Returns False if the item could not be stored, see the class notes.
+        """
+        h = self._cuckoo_hash(item)
+
+        for table in reversed(self.tables):
+            fp = self._fingerprint(h, table)
+            mask = self._num_buckets(table) - 1
+            index1 = h & mask
+            if self._place(table, index1, fp) or self._place(table, self._index2(index1, fp, mask), fp):
+                self.count += 1
                 return True
-            
-        # Kick out logic
-        i = random.choice([index1, index2])
+
+        # Kick out logic, on the newest table. Every displacement is logged
+        # so a failed walk can be rolled back instead of dropping a victim.
+        table = self.tables[-1]
+        fp = self._fingerprint(h, table)
+        mask = self._num_buckets(table) - 1
+        i = random.choice([h & mask, self._index2(h & mask, fp, mask)])
+        displaced = []
         for _ in range(self.max_kicks):
-            if len(self.buckets[i]) == 0:
-                self.buckets[i].append(fp)
-                return True
-                
-            j = random.randint(0, len(self.buckets[i]) - 1)
-            kicked_fp = self.buckets[i][j]
-            self.buckets[i][j] = fp
-            
-            kicked_index1 = self._index1(kicked_fp)
-            kicked_index2 = self._index2(kicked_index1, kicked_fp)
-            
-            if i == kicked_index1:
-                i = kicked_index2
-            else:
-                i = kicked_index1
-                
+            slot = i * self.bucket_size + random.randrange(self.bucket_size)
+            kicked_fp = table[slot]
+            table[slot] = fp
+            displaced.append((slot, kicked_fp))
+
             fp = kicked_fp
-            
-            if len(self.buckets[i]) < self.bucket_size:
-                self.buckets[i].append(fp)
+            i = self._index2(i, fp, mask)
+            if self._place(table, i, fp):
+                self.count += 1
                 return True
-            
-        return False # Insertion failed
-    
+
+        for slot, kicked_fp in reversed(displaced):
+            table[slot] = kicked_fp
+
+        if not self._can_grow(h):
+            return False
+        self._grow()
+        table = self.tables[-1]
+        self._place(table, h & (self._num_buckets(table) - 1), self._fingerprint(h, table))
+        self.count += 1
+        return True
+
     def lookup(self, item: str | int) -> bool:
         """Lookup item in Cuckoo Filter."""
-        fp = self._fingerprint(item)
-        index1 = self._index1(item)
-        index2 = self._index2(index1, fp)
+        h = self._cuckoo_hash(item)
+        for table in reversed(self.tables):
+            fp = self._fingerprint(h, table)
+            mask = self._num_buckets(table) - 1
+            index1 = h & mask
+            if self._contains(table, index1, fp) or self._contains(table, self._index2(index1, fp, mask), fp):
+                return True
+        return False
+
+    def lookup_many(self, items) -> np.ndarray:
+        """Lookup a batch of items, returns a bool array in input order."""
+        items = list(items)
+        found = np.zeros(len(items), dtype=bool)
+        if not items:
+            return found
+        h = self.hasher.hash128_many(items)[0]
+
+        for table in reversed(self.tables):
+            fp, mixed = self._fingerprints_many(h, table)
+            dtype = _FP_TYPES[self._fp_bits(table)][1]
+            num_buckets = self._num_buckets(table)
+            mask = np.uint64(num_buckets - 1)
+            buckets = np.frombuffer(table, dtype=dtype).reshape(num_buckets, self.bucket_size)
+            index1 = h & mask
+            index2 = (index1 ^ mixed) & mask
+            fps = fp.astype(dtype)[:, None]
+            found |= (buckets[index1] == fps).any(axis=1) | (buckets[index2] == fps).any(axis=1)
+        return found
 
-        return fp in self.buckets[index1] or fp in self.buckets[index2]
-    
     def delete(self, item: str | int) -> bool:
         """Delete item from Cuckoo Filter."""
-        fp = self._fingerprint(item)
-        index1 = self._index1(item)
-        index2 = self._index2(index1, fp)
+        h = self._cuckoo_hash(item)
+        for table in reversed(self.tables):
+            fp = self._fingerprint(h, table)
+            mask = self._num_buckets(table) - 1
+            index1 = h & mask
+            for i in [index1, self._index2(index1, fp, mask)]:
+                start = i * self.bucket_size
+                for slot in range(start, start + self.bucket_size):
+                    if table[slot] == fp:
+                        table[slot] = 0
+                        self.count -= 1
+                        return True
 
-        for i in [index1, index2]:
-            if fp in self.buckets[i]:
-                self.buckets[i].remove(fp)
-                return True
-            
         return False
-    
+
+    @property
+    def load_factor(self) -> float:
+        """Fraction of all slots in use."""
+        return self.count / sum(len(table) for table in self.tables)
+
+    @property
+    def false_positive_bound(self) -> float:
+        """Upper bound on the compound false positive rate of all tables.
+
+        A lookup compares 2 * bucket_size slots per table, each matching a
+        random fingerprint of f bits with probability about 1 / (2**f - 1),
+        and treats every slot as full, so the bound stays above the real
+        rate at any load.
+        """
+        return 1 - math.prod(
+            (1 - 1 / ((1 << self._fp_bits(table)) - 1)) ** (2 * self.bucket_size) for table in self.tables
+        )
+
 
 if __name__ == "__main__":
-    cf = CuckooFilter(size=11, bucket_size=2, fp_size=4)
+    cf = CuckooFilter(size=11, bucket_size=2, fp_size=16)
 
     for word in ['dog', 'cat', 'fish', 'horse']:
         print(f"Inserting {word}: {cf.insert(word)}")
 
-    print(cf.buckets)
+    print([list(table) for table in cf.tables])
 
     print("\nChecking membership:")
     for word in ['dog', 'cat', 'bird']:
@@ -106,4 +253,16 @@ if __name__ == "__main__":
 
     print("\nDeleting dog...")
     cf.delete('dog')
-    print("dog in filter?", cf.lookup('dog'))  
\ No newline at end of file
+    print("dog in filter?", cf.lookup('dog'))
+
+    for i in range(1000):
+        cf.insert(f"animal-{i}")
+    print(f"\n{len(cf.tables)} tables, load factor {cf.load_factor:.2f}")
+    print("All found?", cf.lookup_many(f"animal-{i}" for i in range(1000)).all())
+
+    small = CuckooFilter(size=1000, fp_size=8)
+    for i in range(100_000):
+        small.insert(f"item-{i}")
+    observed = small.lookup_many(f"other-{i}" for i in range(100_000)).mean()
+    widths = [small._fp_bits(table) for table in small.tables]
+    print(f"fp widths {widths}: observed FPR {observed:.4f} (bound {small.false_positive_bound:.4f})")
@@ -0,0 +1,129 @@
+"""Shared hashing for the probabilistic data structures.
+
+Every sketch in this folder hashes an item exactly once into a 128-bit
+digest and derives all of its probe positions from the two 64-bit halves
+with double hashing (Kirsch & Mitzenmacher): g_i(x) = h1(x) + i * h2(x).
+
+Digests come from a named, seeded backend instead of Python's built-in
+``hash`` so that results are identical across processes and machines.
+"""
+import hashlib
+import struct
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:  # optional, pip install xxhash
+    xxhash = None
+
+MASK64 = (1 << 64) - 1
+
+_UNPACK = struct.Struct("<QQ").unpack
+
+
+def _to_bytes(item: str | int | bytes) -> bytes:
+    """Encode an item the same way on every platform."""
+    if isinstance(item, bytes):
+        return item
+    if isinstance(item, str):
+        return item.encode("utf-8")
+    return str(item).encode("utf-8")
+
+
+def _blake2b(data: bytes, seed: int) -> bytes:
+    """Keyed BLAKE2b, the seed goes into the salt."""
+    return hashlib.blake2b(data, digest_size=16, salt=seed.to_bytes(16, "little")).digest()
+
+
+def _md5(data: bytes, seed: int) -> bytes:
+    """MD5 with the seed prepended, the scheme the sketches used before."""
+    return hashlib.md5(seed.to_bytes(8, "little") + data).digest()
+
+
+def _xxh3(data: bytes, seed: int) -> bytes:
+    """xxHash3 128-bit, much faster than the hashlib backends."""
+    return xxhash.xxh3_128_digest(data, seed=seed)
+
+
+BACKENDS = {
+    "blake2b": _blake2b,
+    "md5": _md5,
+}
+if xxhash is not None:
+    BACKENDS["xxhash"] = _xxh3
+
+DEFAULT_BACKEND = "xxhash" if xxhash is not None else "blake2b"
+
+
+def double_hash(h1: int, h2: int, k: int, m: int) -> list[int]:
+    """k positions in range(m) from the two halves of one digest."""
+    h2 |= 1  # an odd stride never collapses every probe onto h1
+    return [((h1 + i * h2) & MASK64) % m for i in range(k)]
+
+
+def double_hash_many(h1: np.ndarray, h2: np.ndarray, k: int, m: int) -> np.ndarray:
+    """Vectorized ``double_hash``, returns an (n_items, k) uint64 array."""
+    steps = np.arange(k, dtype=np.uint64)
+    # uint64 arithmetic wraps modulo 2**64, matching the scalar MASK64
+    return (h1[:, None] + steps * (h2 | np.uint64(1))[:, None]) % np.uint64(m)
+
+
+def register_backend(name: str, digest_fn) -> None:
+    """Register a backend ``digest_fn(data: bytes, seed: int) -> 16 bytes``."""
+    BACKENDS[name] = digest_fn
+
+
+class Hasher:
+    """Seeded 128-bit hasher shared by all sketches."""
+
+    def __init__(self, backend: str = DEFAULT_BACKEND, seed: int = 0):
+        """Initialize the hasher."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown hash backend {backend!r}, choose from {sorted(BACKENDS)}.")
+        self.backend = backend
+        self.seed = seed
+        self._digest = BACKENDS[backend]
+
+    def hash128(self, item: str | int | bytes) -> tuple[int, int]:
+        """Return the two 64-bit halves of the item's digest."""
+        return _UNPACK(self._digest(_to_bytes(item), self.seed))
+
+    def hash64(self, item: str | int | bytes) -> int:
+        """Return a single 64-bit hash of the item."""
+        return self.hash128(item)[0]
+
+    def indices(self, item: str | int | bytes, k: int, m: int) -> list[int]:
+        """Derive k positions in range(m) from one digest by double hashing."""
+        return double_hash(*self.hash128(item), k, m)
+
+    def hash128_many(self, items) -> tuple[np.ndarray, np.ndarray]:
+        """Hash a batch of items into two uint64 arrays of digest halves."""
+        digest, seed = self._digest, self.seed
+        raw = b"".join([digest(_to_bytes(item), seed) for item in items])
+        halves = np.frombuffer(raw, dtype="<u8").reshape(-1, 2)
+        return halves[:, 0], halves[:, 1]
+
+    def indices_many(self, items, k: int, m: int) -> np.ndarray:
+        """Vectorized ``indices``, returns an (n_items, k) uint64 array."""
+        return double_hash_many(*self.hash128_many(items), k, m)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Hasher)
+            and self.backend == other.backend
+            and self.seed == other.seed
+        )
+
+    def __repr__(self) -> str:
+        return f"Hasher(backend={self.backend!r}, seed={self.seed})"
+
+    def __reduce__(self):
+        return (Hasher, (self.backend, self.seed))
+
+
+if __name__ == "__main__":
+    hasher = Hasher()
+    print(hasher)
+    print(hasher.hash128("apple"))
+    print(hasher.indices("apple", k=7, m=958))
@@ -0,0 +1,90 @@
+"""Streaming top-k / heavy hitters on top of a Count-Min Sketch."""
+import heapq
+import itertools
+
+from count_min_sketch import CountMinSketch
+
+
+class HeavyHitters:
+    """Tracks the k most frequent items of a stream next to a CountMinSketch.
+
+    A min-heap keyed on the sketch estimate holds the current top k. Heap
+    entries are invalidated lazily when an item's estimate grows, so every
+    ``add`` costs O(log k) and ``top`` never has to rescan the sketch.
+    """
+
+    def __init__(self, k: int, width: int = 2000, depth: int = 5, sketch: CountMinSketch | None = None):
+        """Initialize the tracker, with a fresh sketch unless one is given."""
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        self.k = k
+        self.sketch = sketch or CountMinSketch(width, depth)
+        self.total = 0
+
+        self._estimates = {}  # tracked item -> latest estimate
+        self._heap = []  # (estimate, tiebreak, item), possibly stale
+        self._tiebreak = itertools.count()
+
+    def add(self, item: str, count: int = 1) -> None:
+        """Count an item and update the top-k set."""
+        self.sketch.add(item, count)
+        self.total += count
+        self._offer(item, self.sketch.estimate(item))
+
+    def add_many(self, items, counts=None) -> None:
+        """Count a batch of items, re-ranking each distinct item once."""
+        items = list(items)
+        if not items:
+            return
+        self.sketch.add_many(items, counts)
+        self.total += len(items) if counts is None else int(sum(counts))
+        distinct = list(dict.fromkeys(items))
+        for item, estimate in zip(distinct, self.sketch.estimate_many(distinct).tolist()):
+            self._offer(item, estimate)
+
+    def _offer(self, item: str, estimate: int) -> None:
+        if item in self._estimates or len(self._estimates) < self.k:
+            self._estimates[item] = estimate
+            self._push(item, estimate)
+        elif estimate > self._min_estimate():
+            evicted = heapq.heappop(self._heap)[2]
+            del self._estimates[evicted]
+            self._estimates[item] = estimate
+            self._push(item, estimate)
+
+    def _push(self, item: str, estimate: int) -> None:
+        heapq.heappush(self._heap, (estimate, next(self._tiebreak), item))
+        if len(self._heap) > 2 * self.k:
+            # Drop stale entries so the heap stays O(k).
+            self._heap = [(est, next(self._tiebreak), it) for it, est in self._estimates.items()]
+            heapq.heapify(self._heap)
+
+    def _min_estimate(self) -> int:
+        """Smallest tracked estimate, discarding stale heap entries on the way."""
+        while True:
+            estimate, _, item = self._heap[0]
+            if self._estimates.get(item) == estimate:
+                return estimate
+            heapq.heappop(self._heap)
+
+    def top(self, n: int | None = None) -> list[tuple[str, int]]:
+        """The n (default k) most frequent items with their estimates."""
+        ranked = sorted(self._estimates.items(), key=lambda pair: pair[1], reverse=True)
+        return ranked[:n]
+
+    def heavy_hitters(self, phi: float) -> list[tuple[str, int]]:
+        """Tracked items whose estimate is at least phi * total count."""
+        threshold = phi * self.total
+        return [(item, est) for item, est in self.top() if est >= threshold]
+
+
+if __name__ == "__main__":
+    hh = HeavyHitters(k=3, width=50, depth=4)
+
+    data_stream = ["apple", "banana", "apple", "orange", "banana", "apple", "apple", "grape", "kiwi", "banana"]
+
+    for item in data_stream:
+        hh.add(item)
+
+    print(hh.top())
+    print(hh.heavy_hitters(phi=0.25))
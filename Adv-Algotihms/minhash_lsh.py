@@ -0,0 +1,126 @@
+"""Locality Sensitive Hashing index over MinHash signatures."""
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+from minhash_similarity import MinHash
+
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz  # renamed in NumPy 2.0
+
+
+def _probability(s: np.ndarray, bands: int, rows: int) -> np.ndarray:
+    """Chance that two documents with Jaccard s share at least one band."""
+    return 1 - (1 - s ** rows) ** bands
+
+
+def optimal_params(threshold: float, num_perm: int, fp_weight: float = 0.5, fn_weight: float = 0.5) -> tuple[int, int]:
+    """Bands and rows that best approximate a step at the threshold.
+
+    Minimizes the weighted area of false positives (below the threshold)
+    and false negatives (above it) under the S-curve 1 - (1 - s^r)^b.
+    """
+    below = np.linspace(0, threshold, 512)
+    above = np.linspace(threshold, 1, 512)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = _trapezoid(_probability(below, bands, rows), below)
+            fn = _trapezoid(1 - _probability(above, bands, rows), above)
+            error = fp_weight * fp + fn_weight * fn
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """Banding index that finds near-duplicate candidates in sublinear time.
+
+    Each signature is cut into b bands of r rows. Every band is hashed to a
+    64-bit bucket key, and two documents become candidates when any band
+    lands in the same bucket. b and r are picked from the Jaccard threshold.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, params: tuple[int, int] | None = None, seed: int = 1):
+        """Initialize an empty index for signatures of length num_perm."""
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = params or optimal_params(threshold, num_perm)
+        if self.bands * self.rows > num_perm:
+            raise ValueError("bands * rows cannot exceed num_perm.")
+
+        # Band hash: random multilinear combination of its r values,
+        # wrapping in uint64, so all bands of many signatures hash at once.
+        rng = np.random.default_rng(seed)
+        self._coeffs = rng.integers(1, 2**64, size=(self.bands, self.rows), dtype=np.uint64) | np.uint64(1)
+
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+        self.keys = {}  # key -> its band hashes, for removal
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, bands) bucket keys for an (n, num_perm) signature matrix."""
+        if signatures.shape[-1] != self.num_perm:
+            raise ValueError(f"Expected signatures of length {self.num_perm}.")
+        banded = signatures[..., :self.bands * self.rows].reshape(-1, self.bands, self.rows)
+        return (banded * self._coeffs).sum(axis=2, dtype=np.uint64)
+
+    def insert(self, key, signature: np.ndarray) -> None:
+        """Index one document's signature under key."""
+        self.insert_many([key], signature[None, :])
+
+    def insert_many(self, keys, signatures: np.ndarray) -> None:
+        """Index a batch: keys[i] gets row i of the signature matrix."""
+        keys = list(keys)
+        for key, hashes in zip(keys, self._band_hashes(signatures).tolist()):
+            if key in self.keys:
+                raise ValueError(f"Key {key!r} is already in the index.")
+            self.keys[key] = hashes
+            for bucket, h in zip(self.buckets, hashes):
+                bucket[h].append(key)
+
+    def query(self, signature: np.ndarray) -> set:
+        """Keys sharing at least one band with the signature."""
+        candidates = set()
+        for bucket, h in zip(self.buckets, self._band_hashes(signature).tolist()[0]):
+            candidates.update(bucket.get(h, ()))
+        return candidates
+
+    def remove(self, key) -> None:
+        """Drop a key from the index."""
+        for bucket, h in zip(self.buckets, self.keys.pop(key)):
+            bucket[h].remove(key)
+            if not bucket[h]:
+                del bucket[h]
+
+    def candidate_pairs(self) -> set[tuple]:
+        """Every pair of keys that share a bucket in some band.
+
+        Costs time proportional to the bucket sizes, not to all n^2 pairs.
+        """
+        pairs = set()
+        for bucket in self.buckets:
+            for keys in bucket.values():
+                if len(keys) > 1:
+                    pairs.update(itertools.combinations(sorted(keys), 2))
+        return pairs
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+if __name__ == "__main__":
+    docs = {
+        "D1": "the quick brown fox jumps over the lazy dog".split(),
+        "D2": "the quick brown fox jumped over the lazy dog".split(),
+        "D3": "lorem ipsum dolor sit amet consectetur adipiscing elit".split(),
+        "D4": "the quick brown fox jumps over the lazy cat".split(),
+    }
+    minhash = MinHash(num_perm=128)
+    signatures = minhash.signatures(docs.values())
+
+    lsh = MinHashLSH(threshold=0.5, num_perm=128)
+    print(f"bands={lsh.bands}, rows={lsh.rows}")
+    lsh.insert_many(docs.keys(), signatures)
+
+    print(lsh.query(minhash.signature(docs["D1"])))
+    print(lsh.candidate_pairs())
@@ -0,0 +1,178 @@
+"""Parallel MinHash signing into a memory-mapped .npy signature store.
+
+Documents are streamed in chunks to a process pool. Each worker maps only
+its own rows of the store file and writes the signatures there directly,
+so nothing but a row count travels back to the parent. The finished store
+is a plain .npy file (plus a .keys sidecar) that reopens instantly with
+mmap for similarity queries.
+"""
+import functools
+import io
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from minhash_lsh import MinHashLSH
+from minhash_similarity import MinHash
+
+_DTYPE = np.dtype("<u8")
+
+
+def _npy_header(rows: int, num_perm: int) -> bytes:
+    """.npy header for a (rows, num_perm) uint64 array.
+
+    NumPy pads the header so the row count can change without changing its
+    length, which lets the store grow and be finalized in place.
+    """
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header, {"descr": _DTYPE.str, "fortran_order": False, "shape": (rows, num_perm)}
+    )
+    return header.getvalue()
+
+
+def read_documents(path: str):
+    """Yield (key, words) from a text file of `key<TAB>text` lines."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            key, _, text = line.rstrip("\n").partition("\t")
+            yield key, text.split()
+
+
+@functools.lru_cache(maxsize=None)
+def _minhash(num_perm: int, seed: int) -> MinHash:
+    return MinHash(num_perm, seed)
+
+
+def _sign_chunk(path: str, offset: int, num_perm: int, seed: int, docs: list) -> int:
+    """Worker: sign a chunk straight into its rows of the store file."""
+    rows = np.memmap(path, dtype=_DTYPE, mode="r+", offset=offset, shape=(len(docs), num_perm))
+    minhash = _minhash(num_perm, seed)
+    for row, shingles in enumerate(docs):
+        rows[row] = minhash.signature(shingles)
+    rows.flush()
+    return len(docs)
+
+
+def build_signature_store(
+    documents,
+    path: str,
+    num_perm: int = 128,
+    seed: int = 1,
+    workers: int | None = None,
+    chunk_size: int = 10_000,
+) -> "SignatureStore":
+    """Sign a stream of (key, shingles) pairs into a .npy store at path."""
+    workers = workers or os.cpu_count()
+    header_len = len(_npy_header(0, num_perm))
+    row_bytes = num_perm * _DTYPE.itemsize
+    rows = 0
+
+    with open(path, "wb") as store, open(path + ".keys", "w", encoding="utf-8") as keys:
+        store.write(_npy_header(0, num_perm))
+        store.flush()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            it = iter(documents)
+            while chunk := list(itertools.islice(it, chunk_size)):
+                chunk_keys, docs = zip(*chunk)
+                keys.writelines(f"{key}\n" for key in chunk_keys)
+                offset = header_len + rows * row_bytes
+                rows += len(docs)
+                store.truncate(header_len + rows * row_bytes)  # sparse extend
+                pending.add(pool.submit(_sign_chunk, path, offset, num_perm, seed, list(docs)))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+            for future in pending:
+                future.result()
+
+        store.seek(0)
+        store.write(_npy_header(rows, num_perm))
+    return SignatureStore.open(path)
+
+
+class SignatureStore:
+    """Read-only view of a signature store, memory-mapped on open."""
+
+    def __init__(self, signatures: np.ndarray, keys: list[str]):
+        """Wrap an (n, num_perm) signature matrix and its row keys."""
+        self.signatures = signatures
+        self.keys = keys
+
+    @classmethod
+    def open(cls, path: str) -> "SignatureStore":
+        """Map the store, no signature is read until it is used."""
+        with open(path + ".keys", encoding="utf-8") as f:
+            keys = f.read().splitlines()
+        return cls(np.load(path, mmap_mode="r"), keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def num_perm(self) -> int:
+        return self.signatures.shape[1]
+
+    def similar(self, signature: np.ndarray, threshold: float, chunk_rows: int = 100_000) -> list[tuple[str, float]]:
+        """Keys whose estimated Jaccard with the signature is at least threshold.
+
+        A linear scan in chunks, for when there is no LSH index at hand.
+        """
+        matches = []
+        for start in range(0, len(self), chunk_rows):
+            scores = (self.signatures[start:start + chunk_rows] == signature).mean(axis=1)
+            for row in np.flatnonzero(scores >= threshold).tolist():
+                matches.append((self.keys[start + row], float(scores[row])))
+        return matches
+
+    def build_lsh(self, threshold: float = 0.8, chunk_rows: int = 100_000) -> MinHashLSH:
+        """Index the whole store in an LSH index."""
+        lsh = MinHashLSH(threshold, self.num_perm)
+        for start in range(0, len(self), chunk_rows):
+            lsh.insert_many(self.keys[start:start + chunk_rows], np.asarray(self.signatures[start:start + chunk_rows]))
+        return lsh
+
+
+def benchmark(num_docs: int = 40_000, words_per_doc: int = 200, worker_counts=(1, 2, 4, 8)) -> None:
+    """Documents/sec for increasing worker counts."""
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    vocabulary = [f"w{i}" for i in range(50_000)]
+    corpus = [
+        (f"doc-{i}", [vocabulary[j] for j in rng.integers(0, len(vocabulary), words_per_doc)])
+        for i in range(num_docs)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            path = os.path.join(tmp, f"signatures-{workers}.npy")
+            start = time.perf_counter()
+            build_signature_store(corpus, path, workers=workers, chunk_size=1000)
+            elapsed = time.perf_counter() - start
+            print(f"{workers} worker(s): {num_docs / elapsed:10,.0f} docs/s")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    corpus = [
+        ("D1", "the quick brown fox jumps over the lazy dog".split()),
+        ("D2", "the quick brown fox jumped over the lazy dog".split()),
+        ("D3", "lorem ipsum dolor sit amet consectetur adipiscing elit".split()),
+    ]
+    path = os.path.join(tempfile.gettempdir(), "signatures.npy")
+    build_signature_store(corpus, path, workers=2)
+
+    store = SignatureStore.open(path)
+    print(len(store), store.signatures.shape, type(store.signatures).__name__)
+    print(store.similar(store.signatures[0], threshold=0.5))
+    print(store.build_lsh(threshold=0.5).candidate_pairs())
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -1,38 +1,80 @@
 import numpy as np
 
-def minhash_signature(docs: dict):
-    """Minhash Algorithm."""
-    all_words = sorted(set(word for doc in docs.values() for word in doc))
+from hashing import Hasher
 
-    word_to_index = {word: i for i, word in enumerate(all_words)}
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
 
-    matrix = np.zeros((len(all_words), len(docs)), dtype=int)
+_P = np.uint64(_MERSENNE_PRIME)
+_LOW29 = np.uint64((1 << 29) - 1)
 
-    for col, doc in enumerate(docs.values()):
-        for word in doc:
-            matrix[word_to_index[word]][col] = 1
 
-    print("Characteristic Matrix:\n", matrix)
+def _fold(v: np.ndarray) -> np.ndarray:
+    """Partial reduction mod 2**61 - 1, using 2**61 = 1."""
+    return (v & _P) + (v >> np.uint64(61))
 
-    def h1(x): return (x +1 ) %4
-    def h2(x): return (3*x + 2) % 4
-    hash_fns = [h1, h2]
 
-    num_hashes = len(hash_fns)
-    num_docs = len(docs)
+def _permute(a: np.ndarray, b: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """(a * x + b) mod (2**61 - 1) without leaving uint64.
 
-    signature = np.full((num_hashes, num_docs), np.inf)
+    a < 2**61 is split into 32-bit halves so each partial product fits in
+    64 bits (x < 2**32), and the high product's shift by 32 is reduced with
+    the Mersenne identity before it can overflow.
+    """
+    low = _fold((a & np.uint64(_MAX_HASH)) * x)
+    t = (a >> np.uint64(32)) * x  # < 2**61
+    high = (t >> np.uint64(29)) + ((t & _LOW29) << np.uint64(32))
+    v = _fold(_fold(low + high + b))
+    return np.where(v >= _P, v - _P, v)
 
-    for row in range(len(all_words)):
-        for i, h in enumerate(hash_fns):
-            hashed_rows = h(row)
-            for col in range(num_docs):
-                if matrix[row, col] == 1:
-                    signature[i, col] = min(signature[i, col], hashed_rows)
+class MinHash:
+    """MinHash signatures with a universal hash family (a * x + b) mod p.
 
-    print("\nMinhash Signature Matrix:\n", signature.astype(int))
+    Each shingle is hashed once to 32 bits and pushed through all num_perm
+    permutations in one NumPy expression, with p the Mersenne prime
+    2 ** 61 - 1. A document's signature is the per-permutation minimum
+    over its shingles, no characteristic matrix is ever built.
+    """
 
-    return signature
+    def __init__(self, num_perm: int = 128, seed: int = 1, chunk_size: int = 4096):
+        """Draw num_perm permutations, reproducibly from the seed."""
+        self.num_perm = num_perm
+        self.seed = seed
+        self.chunk_size = chunk_size  # bounds the (num_perm, chunk) work array
+        self.hasher = Hasher(seed=seed)
+
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, shingles) -> np.ndarray:
+        """(num_perm,) uint64 signature of one document's shingles."""
+        signature = np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        shingles = list(set(shingles))
+        if not shingles:
+            return signature
+        x = self.hasher.hash128_many(shingles)[0] & np.uint64(_MAX_HASH)
+        for start in range(0, len(x), self.chunk_size):
+            permuted = _permute(self.a, self.b, x[start:start + self.chunk_size])
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature
+
+    def signatures(self, docs) -> np.ndarray:
+        """(num_docs, num_perm) signature matrix, one row per document."""
+        docs = list(docs)
+        matrix = np.empty((len(docs), self.num_perm), dtype=np.uint64)
+        for row, doc in enumerate(docs):
+            matrix[row] = self.signature(doc)
+        return matrix
+
+    @staticmethod
+    def jaccard(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        return float(np.mean(signature_a == signature_b))
+
+def minhash_signature(docs: dict, num_perm: int = 128, seed: int = 1):
+    """Minhash Algorithm, returns a (num_perm, num_docs) signature matrix."""
+    return MinHash(num_perm, seed).signatures(docs.values()).T
 
 def estimate_jaccard(signature: list, cols: list[int]):
     """Estimate Jaccard Similarity using Minhash Signature."""
@@ -46,7 +88,6 @@ if __name__ == "__main__":
     }
     signature = minhash_signature(docs)
 
-    print("\nEstimated Similarity (D1 vs D2):", estimate_jaccard(signature, [0, 1]))
+    print("Estimated Similarity (D1 vs D2):", estimate_jaccard(signature, [0, 1]))
     print("Estimated Similarity (D1 vs D3):", estimate_jaccard(signature, [0, 2]))
     print("Estimated Similarity (D2 vs D3):", estimate_jaccard(signature, [1, 2]))
-
@@ -0,0 +1,140 @@
+"""Scalable Bloom Filter Implementation (Almeida et al., 2007)."""
+import math
+
+import numpy as np
+
+from bloom_filter import BloomFilter
+from hashing import Hasher, double_hash
+
+
+class ScalableBloomFilter:
+    """Bloom filter that keeps its false positive target as it grows.
+
+    Items go into the newest slice. Once that slice's fill ratio crosses
+    ``fill_threshold`` a new slice is chained on, ``growth`` times larger and
+    with an error rate ``tightening`` times smaller, so the compound false
+    positive rate stays below ``false_positive_rate`` no matter how many
+    items arrive.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int,
+        false_positive_rate: float,
+        growth: int = 2,
+        tightening: float = 0.5,
+        fill_threshold: float = 0.5,
+        hasher: Hasher | None = None,
+    ):
+        """Initialize the Scalable Bloom Filter with a single slice."""
+        self.initial_capacity = initial_capacity
+        self.p = false_positive_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.fill_threshold = fill_threshold
+        self.hasher = hasher or Hasher()
+
+        self.slices: list[BloomFilter] = []
+        self._add_slice()
+
+    def _add_slice(self) -> None:
+        """Chain a larger slice with a geometrically tighter error rate."""
+        i = len(self.slices)
+        capacity = self.initial_capacity * self.growth ** i
+        # sum over i of p * (1 - r) * r**i converges to p
+        p_i = self.p * (1 - self.tightening) * self.tightening ** i
+        self.slices.append(BloomFilter(capacity, p_i, self.hasher))
+
+    def _room(self, bloom: BloomFilter) -> int:
+        """Items the slice takes before its expected fill ratio hits the threshold.
+
+        The expected fraction of set bits after c insertions is
+        1 - exp(-k * c / m), so this is O(1) instead of a popcount. The
+        slice's false positive rate is fill ** k, so the threshold is also
+        capped where that reaches the slice's own error target (k is rounded
+        down, which otherwise lets a half-full slice overshoot it).
+        """
+        fill = min(self.fill_threshold, bloom.p ** (1 / bloom.k))
+        limit = -bloom.size / bloom.k * math.log(1 - fill)
+        return max(0, math.ceil(limit) - bloom.count)
+
+    def add(self, item: str | int) -> None:
+        """Add an item, growing the filter first if the newest slice is full."""
+        h1, h2 = self.hasher.hash128(item)
+        if self._contains(h1, h2):
+            return  # re-adding would only fill the slice faster
+        active = self.slices[-1]
+        if self._room(active) == 0:
+            self._add_slice()
+            active = self.slices[-1]
+        for idx in double_hash(h1, h2, active.k, active.size):
+            active.bit_array[idx] = 1
+        active.count += 1
+
+    def _contains(self, h1: int, h2: int) -> bool:
+        # Newest slices are the largest and hold most of the items.
+        for bloom in reversed(self.slices):
+            bit_array = bloom.bit_array
+            if all(bit_array[idx] for idx in double_hash(h1, h2, bloom.k, bloom.size)):
+                return True
+        return False
+
+    def check(self, item: str | int) -> bool:
+        """Check if an item is in the Scalable Bloom Filter."""
+        return self._contains(*self.hasher.hash128(item))
+
+    def add_many(self, items) -> None:
+        """Add a batch of items, hashing each one only once."""
+        items = list(dict.fromkeys(items))
+        if not items:
+            return
+        h1, h2 = self.hasher.hash128_many(items)
+        new = ~self._check_digests(h1, h2)
+        h1, h2 = h1[new], h2[new]
+        while len(h1):
+            active = self.slices[-1]
+            room = self._room(active)
+            if room == 0:
+                self._add_slice()
+                continue
+            active._add_digests(h1[:room], h2[:room])
+            h1, h2 = h1[room:], h2[room:]
+
+    def check_many(self, items) -> np.ndarray:
+        """Check a batch of items, returns a bool array in input order."""
+        items = list(items)
+        if not items:
+            return np.zeros(0, dtype=bool)
+        return self._check_digests(*self.hasher.hash128_many(items))
+
+    def _check_digests(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(h1), dtype=bool)
+        for bloom in reversed(self.slices):
+            pending = np.flatnonzero(~found)
+            if not len(pending):
+                break
+            found[pending] = bloom._check_digests(h1[pending], h2[pending])
+        return found
+
+    @property
+    def count(self) -> int:
+        """Distinct items added (up to false positives)."""
+        return sum(bloom.count for bloom in self.slices)
+
+    @property
+    def false_positive_bound(self) -> float:
+        """Upper bound on the compound false positive rate of all slices."""
+        return 1 - math.prod(1 - bloom.p for bloom in self.slices)
+
+
+if __name__ == "__main__":
+    sbf = ScalableBloomFilter(initial_capacity=1000, false_positive_rate=0.01)
+
+    sbf.add_many(f"user-{i}" for i in range(50_000))
+    sbf.add("apple")
+
+    print(f"{len(sbf.slices)} slices, {sbf.count} items")
+    print(sbf.check("apple"), sbf.check("user-42"), sbf.check("cherry"))
+
+    probes = [f"other-{i}" for i in range(100_000)]
+    print(f"Observed FPR: {sbf.check_many(probes).mean():.4f} (bound {sbf.false_positive_bound:.4f})")
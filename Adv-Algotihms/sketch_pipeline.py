@@ -0,0 +1,140 @@
+"""Sharded, multi-process construction of mergeable sketches.
+
+BloomFilter (bitwise OR), CountMinSketch (element-wise add) and HyperLogLog
+registers (element-wise max) can all be built on disjoint parts of a stream
+and merged afterwards into exactly the sketch of the whole stream.
+"""
+import functools
+import itertools
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bloom_filter import BloomFilter
+from count_min_sketch import CountMinSketch
+from hyperloglog_algo import HyperLogLog
+
+# Attribute holding the bulk state of each mergeable sketch.
+_STATE_ATTRS = ("bit_array", "table", "registers")
+
+
+def _chunks(items, chunk_size: int):
+    it = iter(items)
+    while chunk := list(itertools.islice(it, chunk_size)):
+        yield chunk
+
+
+def _state_attr(sketch) -> str:
+    for name in _STATE_ATTRS:
+        if getattr(sketch, name, None) is not None:
+            return name
+    raise TypeError(f"{type(sketch).__name__} has none of the state buffers {_STATE_ATTRS}.")
+
+
+def _state(sketch) -> np.ndarray:
+    """Writable byte view of the sketch's bulk state (bitarray, ndarray or bytearray)."""
+    return np.frombuffer(getattr(sketch, _state_attr(sketch)), dtype=np.uint8)
+
+
+def _shard(factory, chunks, results, shm_name: str, index: int) -> None:
+    """One long-lived worker: fold every chunk it is dealt into a single sketch.
+
+    The finished state is copied into slot `index` of the shared block and
+    only the sketch's small remaining attributes go back over the queue.
+    """
+    sketch, error = None, None
+    try:
+        sketch = factory()
+    except Exception as exc:
+        error = exc
+    while (chunk := chunks.get()) is not None:
+        if error is None:
+            try:
+                sketch.add_many(chunk)
+            except Exception as exc:
+                error = exc  # keep draining so the feeder never blocks
+    if error is not None:
+        results.put((index, None, error))
+        return
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        state = _state(sketch)
+        slots = np.ndarray((index + 1, state.size), dtype=np.uint8, buffer=shm.buf)
+        slots[index] = state
+        del slots
+    finally:
+        shm.close()
+    attr = _state_attr(sketch)
+    results.put((index, {k: v for k, v in vars(sketch).items() if k != attr}, None))
+
+
+def build_parallel(factory, items, workers: int | None = None, chunk_size: int = 1_000_000):
+    """Build one sketch over items using `workers` long-lived processes.
+
+    `factory` must be picklable (a class, a top-level function or a
+    functools.partial of one) and return an empty sketch with ``add_many``
+    and ``merge``. Chunks of `chunk_size` items are dealt round-robin to
+    the shards, each of which fills one sketch for its whole share of the
+    stream. Chunks still travel as pickled lists, but every shard returns
+    its partial once, as raw bytes in a shared memory block, and the
+    partials are reduced in a single pass at the end.
+    """
+    workers = workers or os.cpu_count()
+    result = factory()
+    nbytes = _state(result).size
+    shm = shared_memory.SharedMemory(create=True, size=max(1, workers * nbytes))
+    queues = [multiprocessing.Queue(maxsize=2) for _ in range(workers)]
+    results = multiprocessing.Queue()
+    shards = [
+        multiprocessing.Process(target=_shard, args=(factory, queues[i], results, shm.name, i), daemon=True)
+        for i in range(workers)
+    ]
+    try:
+        for shard in shards:
+            shard.start()
+        for i, chunk in enumerate(_chunks(items, chunk_size)):
+            queues[i % workers].put(chunk)
+        for queue in queues:
+            queue.put(None)
+
+        fields = [None] * workers
+        for _ in range(workers):
+            index, attrs, error = results.get()
+            if error is not None:
+                raise error
+            fields[index] = attrs
+        for shard in shards:
+            shard.join()
+
+        slots = np.ndarray((workers, nbytes), dtype=np.uint8, buffer=shm.buf)
+        vars(result).update(fields[0])
+        _state(result)[:] = slots[0]
+        partial = factory()
+        for i in range(1, workers):
+            vars(partial).update(fields[i])
+            _state(partial)[:] = slots[i]
+            result.merge(partial)
+        del slots
+    finally:
+        for shard in shards:
+            if shard.is_alive():
+                shard.terminate()
+        shm.close()
+        shm.unlink()
+    return result
+
+
+if __name__ == "__main__":
+    data = [str(i) for i in range(200_000)]
+
+    bloom = build_parallel(functools.partial(BloomFilter, 200_000, 0.01), data, chunk_size=50_000)
+    print("Bloom:", bloom.count, bloom.check("12345"), bloom.check("cherry"))
+
+    cms = build_parallel(functools.partial(CountMinSketch, 50_000, 5), data + data[:10], chunk_size=50_000)
+    print("Count-Min:", cms.estimate("3"), cms.estimate("199999"))
+
+    hll = build_parallel(functools.partial(HyperLogLog, 10), data, chunk_size=50_000)
+    print("HyperLogLog:", hll.count())
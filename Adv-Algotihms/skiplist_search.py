@@ -1,33 +1,94 @@
 import random
+import sys
+import time
 
 class SkipListNode:
 
+    __slots__ = ("value", "forward", "width")  # no per-node __dict__
+
     def __init__(self, value: int, level: int):
         self.value = value
         self.forward = [None] * (level + 1)
+        # width[i]: how many level-0 steps forward[i] skips over
+        self.width = [0] * (level + 1)
 
 class SkipList:
+    """Skip list with a height that grows with log2(n).
+
+    Every forward link also records its width (the number of level-0 links
+    it spans), which gives rank and select in O(log n).
+    """
 
-    MAX_LEVEL = 4
+    MAX_LEVEL = 32
     P = 0.5 # Probability for level increase
 
     def __init__(self):
-        self.head = SkipListNode(value=None, level=self.MAX_LEVEL)
+        self.head = SkipListNode(value=None, level=0)
         self.level = 0
+        self.length = 0
+
+    @classmethod
+    def from_sorted(cls, values, randomized: bool = False) -> "SkipList":
+        """Build a skip list from ascending values in one linear pass.
+
+        By default the node at 1-based position r gets one level per
+        trailing zero bit of r, a perfectly balanced layout. With
+        randomized=True levels are drawn as ``insert`` would draw them.
+        """
+        skiplist = cls()
+        head = skiplist.head
+        last = [head]  # newest node reaching each level
+        last_rank = [0]
+        rank = 0
+        previous = None
+
+        for value in values:
+            if rank and value < previous:
+                raise ValueError("from_sorted needs values in ascending order.")
+            previous = value
+            rank += 1
+            if randomized:
+                level = skiplist._random_level()
+            else:
+                level = min(cls.MAX_LEVEL, (rank & -rank).bit_length() - 1)
+
+            node = SkipListNode(value=value, level=level)
+            while len(last) <= level:
+                head.forward.append(None)
+                head.width.append(0)
+                last.append(head)
+                last_rank.append(0)
+            for i in range(level + 1):
+                last[i].forward[i] = node
+                last[i].width[i] = rank - last_rank[i]
+                last[i] = node
+                last_rank[i] = rank
+            skiplist.level = len(last) - 1
+            skiplist.length = rank
+
+        # Links to the end of the list span the remaining positions.
+        for i, node in enumerate(last):
+            node.width[i] = rank - last_rank[i]
+        return skiplist
 
 
     def _random_level(self):
+        # Let the list get about log2(n) levels tall, one level at a time.
+        cap = min(self.MAX_LEVEL, max(self.level + 1, self.length.bit_length()))
         lvl = 0
-        while random.random() < self.P and lvl < self.MAX_LEVEL:
+        while random.random() < self.P and lvl < cap:
             lvl += 1
         return lvl
-    
+
     def insert(self, value: int):
-        update = [None] * (self.MAX_LEVEL + 1)
+        update = [None] * (self.level + 1)
+        rank = [0] * (self.level + 1)  # position of update[i] in the list
         current = self.head
 
         for i in reversed(range(self.level + 1)):
+            rank[i] = 0 if i == self.level else rank[i + 1]
             while current.forward[i] and current.forward[i].value < value:
+                rank[i] += current.width[i]
                 current = current.forward[i]
             update[i] = current
 
@@ -36,23 +97,105 @@ class SkipList:
 
         if level > self.level:
             for i in range(self.level + 1, level + 1):
-                update[i] = self.head
+                self.head.forward.append(None)
+                self.head.width.append(self.length)
+                update.append(self.head)
+                rank.append(0)
             self.level = level
 
-        # Update forward pointers
+        # Update forward pointers and widths
         new_node = SkipListNode(value=value, level=level)
         for i in range(level + 1):
             new_node.forward[i] = update[i].forward[i]
             update[i].forward[i] = new_node
 
+            new_node.width[i] = update[i].width[i] - (rank[0] - rank[i])
+            update[i].width[i] = rank[0] - rank[i] + 1
+
+        # Links passing over the new node got one step longer
+        for i in range(level + 1, self.level + 1):
+            update[i].width[i] += 1
+        self.length += 1
+
+    def delete(self, value: int) -> bool:
+        """Remove one occurrence of value, returns False if it is absent."""
+        update = [None] * (self.level + 1)
+        current = self.head
+        for i in reversed(range(self.level + 1)):
+            while current.forward[i] and current.forward[i].value < value:
+                current = current.forward[i]
+            update[i] = current
+
+        target = current.forward[0]
+        if target is None or target.value != value:
+            return False
 
-    def search(self, value: int):
+        for i in range(self.level + 1):
+            if update[i].forward[i] is target:
+                update[i].width[i] += target.width[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].width[i] -= 1
+
+        while self.level > 0 and self.head.forward[self.level] is None:
+            self.head.forward.pop()
+            self.head.width.pop()
+            self.level -= 1
+        self.length -= 1
+        return True
+
+    def _first_at_least(self, value: int):
+        """First node whose value is >= value, or None."""
         current = self.head
         for i in reversed(range(self.level + 1)):
             while current.forward[i] and current.forward[i].value < value:
                 current = current.forward[i]
-        return current.forward[0] and current.forward[0].value == value
-    
+        return current.forward[0]
+
+    def search(self, value: int) -> bool:
+        node = self._first_at_least(value)
+        return node is not None and node.value == value
+
+    def range(self, lo: int, hi: int):
+        """Yield values v with lo <= v < hi in order."""
+        node = self._first_at_least(lo)
+        while node and node.value < hi:
+            yield node.value
+            node = node.forward[0]
+
+    def rank(self, value: int) -> int:
+        """Number of values strictly smaller than value."""
+        current = self.head
+        position = 0
+        for i in reversed(range(self.level + 1)):
+            while current.forward[i] and current.forward[i].value < value:
+                position += current.width[i]
+                current = current.forward[i]
+        return position
+
+    def select(self, index: int) -> int:
+        """The value at 0-based position index in sorted order."""
+        if not 0 <= index < self.length:
+            raise IndexError("SkipList index out of range")
+        current = self.head
+        traversed = 0
+        for i in reversed(range(self.level + 1)):
+            while current.forward[i] and traversed + current.width[i] <= index + 1:
+                traversed += current.width[i]
+                current = current.forward[i]
+        return current.value
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        node = self.head.forward[0]
+        while node:
+            yield node.value
+            node = node.forward[0]
+
+    __contains__ = search
+
     @property
     def display(self):
         print("\nSkip List:")
@@ -73,4 +216,25 @@ if __name__ == "__main__":
     s.display
 
     print("\nSearch 19:", s.search(19))  # True
-    print("Search 15:", s.search(15))    # False
\ No newline at end of file
+    print("Search 15:", s.search(15))    # False
+
+    print("\nRange [7, 20):", list(s.range(7, 20)))
+    print("Rank of 19:", s.rank(19))     # 6
+    print("Select 6:", s.select(6))      # 19
+
+    s.delete(19)
+    print("After deleting 19:", list(s), "length", len(s))
+
+    bulk = SkipList.from_sorted([3, 6, 7, 9, 12, 17, 19, 21, 25, 26])
+    bulk.display
+
+    if "--bench" in sys.argv:
+        values = list(range(1_000_000))
+        start = time.perf_counter()
+        looped = SkipList()
+        for val in values:
+            looped.insert(val)
+        print(f"\ninsert loop: {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        SkipList.from_sorted(values)
+        print(f"from_sorted: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,196 @@
+"""
+Graph algorithms that run directly on the classes in graph_representation:
+1. Breadth First Search with a NumPy frontier over CSR arrays
+2. Dijkstra's shortest paths with a binary heap and an array distance table
+3. Connected Components by vectorized union-find
+4. Degree Statistics
+
+Every function accepts any graph class and converts it to a CSRGraph
+first. Results come back as arrays indexed by vertex.
+"""
+
+import heapq
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from graph_representation import BitMatrixGraph, CSRGraph
+
+
+def as_csr(graph) -> CSRGraph:
+    """The graph as a CSRGraph, converted only if it is not one already."""
+    if isinstance(graph, CSRGraph):
+        return graph
+    if isinstance(graph, BitMatrixGraph):
+        return graph.to_csr()
+    return CSRGraph.from_graph(graph)
+
+
+def _gather(csr: CSRGraph, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """All (source, target) edges leaving the frontier, without a Python loop."""
+    starts = csr.indptr[frontier]
+    counts = csr.indptr[frontier + 1] - starts
+    # Position of each edge: its row start plus its offset within the row.
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    edges = np.repeat(starts, counts) + offsets
+    return np.repeat(frontier, counts), csr.indices[edges]
+
+
+def bfs(graph, source: int) -> tuple[np.ndarray, np.ndarray]:
+    """Breadth First Search from source, one whole level at a time.
+
+    Returns (distance, parent): hop counts and BFS tree parents, both -1
+    for vertices that cannot be reached (parent is also -1 for source).
+    """
+    csr = as_csr(graph)
+    if not 0 <= source < csr.num_vertices:
+        raise ValueError("Error out of bounds.")
+    distance = np.full(csr.num_vertices, -1, dtype=np.int64)
+    parent = np.full(csr.num_vertices, -1, dtype=np.int64)
+    distance[source] = 0
+
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        sources, targets = _gather(csr, frontier)
+        unseen = distance[targets] == -1
+        # unique keeps one discovering edge per new vertex.
+        frontier, first = np.unique(targets[unseen], return_index=True)
+        level += 1
+        distance[frontier] = level
+        parent[frontier] = sources[unseen][first]
+    return distance, parent
+
+
+def dijkstra(graph, source: int) -> tuple[np.ndarray, np.ndarray]:
+    """Dijkstra's shortest paths from source with a lazy binary heap.
+
+    Unweighted graphs use weight 1 per edge. Returns (distance, parent),
+    with inf and -1 for vertices that cannot be reached.
+    """
+    csr = as_csr(graph)
+    n = csr.num_vertices
+    if not 0 <= source < n:
+        raise ValueError("Error out of bounds.")
+    if csr.weights is not None and csr.num_edges and csr.weights.min() < 0:
+        raise ValueError("Dijkstra needs non-negative edge weights.")
+
+    # array.array gives scalar reads and writes at list speed, and hands
+    # its buffer to NumPy at the end without a copy.
+    distance = array("d", [float("inf")]) * n
+    parent = array("q", [-1]) * n
+    done = bytearray(n)
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    distance[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue  # stale entry, u was settled with a shorter path
+        done[u] = 1
+        start, end = indptr[u], indptr[u + 1]
+        targets = indices[start:end].tolist()
+        costs = weights[start:end].tolist() if weights is not None else [1.0] * len(targets)
+        for v, cost in zip(targets, costs):
+            candidate = d + cost
+            if candidate < distance[v]:
+                distance[v] = candidate
+                parent[v] = u
+                heapq.heappush(heap, (candidate, v))
+    return np.frombuffer(distance, dtype=np.float64), np.frombuffer(parent, dtype=np.int64)
+
+
+def connected_components(graph) -> np.ndarray:
+    """Component label of every vertex, the smallest vertex id in it.
+
+    Edge direction is ignored (weak components for directed graphs). Each
+    round hooks the larger root of every edge that still spans two trees
+    onto the smaller one, then pointer-jumps until every vertex points at
+    its root. Edges inside one tree never matter again and are dropped.
+    """
+    csr = as_csr(graph)
+    parent = np.arange(csr.num_vertices, dtype=np.int64)
+    src = np.repeat(parent, csr.out_degree)
+    dst = csr.indices
+    while src.size:
+        root_u, root_v = parent[src], parent[dst]
+        spanning = root_u != root_v
+        src, dst = src[spanning], dst[spanning]
+        if not src.size:
+            break
+        low = np.minimum(root_u[spanning], root_v[spanning])
+        high = np.maximum(root_u[spanning], root_v[spanning])
+        # Any low will do, parents only ever point to smaller ids, no cycles.
+        parent[high] = low
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def degree_statistics(graph) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(out_degree, in_degree, histogram), histogram[d] vertices of out-degree d.
+
+    For an undirected graph both degree arrays are the plain degree.
+    """
+    csr = as_csr(graph)
+    out_degree = csr.out_degree
+    in_degree = np.bincount(csr.indices, minlength=csr.num_vertices)
+    return out_degree, in_degree, np.bincount(out_degree)
+
+
+def benchmark(num_vertices: int = 1_000_000, num_edges: int = 10_000_000) -> None:
+    """Run every algorithm on random graphs with millions of edges."""
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    graph = CSRGraph.from_edges(
+        num_vertices, rng.integers(0, num_vertices, size=(num_edges, 2)), directed=False
+    )
+    print(f"build {num_vertices:,} vertices, {num_edges:,} undirected edges: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    distance, _ = bfs(graph, 0)
+    print(f"bfs: {time.perf_counter() - start:.2f}s, {np.count_nonzero(distance >= 0):,} reached, "
+          f"depth {distance.max()}")
+
+    start = time.perf_counter()
+    labels = connected_components(graph)
+    print(f"connected_components: {time.perf_counter() - start:.2f}s, {np.unique(labels).size:,} components")
+
+    start = time.perf_counter()
+    out_degree, _, histogram = degree_statistics(graph)
+    print(f"degree_statistics: {time.perf_counter() - start:.2f}s, mean {out_degree.mean():.1f}, "
+          f"max {out_degree.max()}, {histogram[0]:,} isolated")
+
+    n, m = num_vertices // 5, num_edges // 5
+    weighted = CSRGraph.from_edges(n, rng.integers(0, n, size=(m, 2)), weights=rng.random(m))
+    start = time.perf_counter()
+    distance, _ = dijkstra(weighted, 0)
+    print(f"dijkstra, {n:,} vertices, {m:,} weighted edges: {time.perf_counter() - start:.2f}s, "
+          f"{np.count_nonzero(np.isfinite(distance)):,} reached")
+
+
+if __name__ == "__main__":
+    from graph_representation import AdjacencyListUndirectedGraph
+
+    NUM_VERTICES = 7
+    EDGES = [(0, 1), (0, 4), (1, 2), (1, 3), (1, 4), (2, 3), (3, 4), (5, 6)]
+
+    graph = AdjacencyListUndirectedGraph(NUM_VERTICES)
+    for u, v in EDGES:
+        graph.add_edge(u, v)
+
+    print("bfs:", bfs(graph, 0))
+    print("components:", connected_components(graph))
+    print("degrees:", degree_statistics(graph))
+
+    weighted = CSRGraph.from_edges(NUM_VERTICES, EDGES, weights=[4, 1, 1, 5, 2, 1, 1, 3], directed=False)
+    print("dijkstra:", dijkstra(weighted, 0))
+
+    if "--bench" in sys.argv:
+        benchmark()
@@ -4,10 +4,16 @@ A Python script to represent graph in all ways:
 2. Adjacency List for Directed Graph
 3. Adjacency Matrix for Undirected Graph
 4. Adjacency Matrix for Directed Graph
+5. Compressed Sparse Row (CSR) arrays, built in bulk from an edge array
+6. Bit-packed Adjacency Matrix for dense graphs
 """
 
+import sys
+import time
 from collections import defaultdict
 
+import numpy as np
+
 
 class AdjacencyListUndirectedGraph:
     """Adjacency List for Undirected Graph."""
@@ -19,7 +25,7 @@ class AdjacencyListUndirectedGraph:
 
     def add_edge(self, u: int, v: int) -> None:
         """Add an undirected graph between vertex u and v."""
-        if u > self.num_vertices or v > self.num_vertices:
+        if not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
             raise ValueError("Error out of bounds.")
         self.adj_list[u].append(v)
         self.adj_list[v].append(u)
@@ -39,7 +45,7 @@ class AdjacencyListDirectedGraph:
 
     def add_edge(self, u: int, v: int) -> None:
         """Add an directed graph between vertex u and v."""
-        if u > self.num_vertices or v > self.num_vertices:
+        if not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
             raise ValueError("Error out of bounds.")
         self.adj_list[u].append(v)
 
@@ -58,7 +64,7 @@ class AdjacencyMatrixUndirectedGraph:
 
     def add_edge(self, u: int, v: int) -> None:
         """Add an undirected edge in matrix."""
-        if u > self.num_vertices or v > self.num_vertices:
+        if not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
             raise ValueError("Error out of bounds.")
         self.adj_matrix[u][v] = 1
         self.adj_matrix[v][u] = 1
@@ -78,7 +84,7 @@ class AdjacencyMatrixDirectedGraph:
 
     def add_edge(self, u: int, v: int) -> None:
         """Add an undirected edge in matrix."""
-        if u > self.num_vertices or v > self.num_vertices:
+        if not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
             raise ValueError("Error out of bounds.")
         self.adj_matrix[u][v] = 1
 
@@ -87,6 +93,205 @@ class AdjacencyMatrixDirectedGraph:
         return self.adj_matrix
 
 
+def _edge_array(num_vertices: int, edges) -> tuple[np.ndarray, np.ndarray]:
+    """Split an (E, 2) edge array into checked source and target arrays."""
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if edges.size and (edges.min() < 0 or edges.max() >= num_vertices):
+        raise ValueError("Error out of bounds.")
+    return edges[:, 0], edges[:, 1]
+
+
+def _stored_edges(graph) -> tuple[np.ndarray, bool]:
+    """(E, 2) array of the edges stored in one of the four classes above.
+
+    Undirected classes already hold both directions of every edge.
+    """
+    directed = isinstance(graph, (AdjacencyListDirectedGraph, AdjacencyMatrixDirectedGraph))
+    if hasattr(graph, "adj_list"):
+        edges = [(u, v) for u, targets in graph.adj_list.items() for v in targets]
+        return np.array(edges, dtype=np.int64).reshape(-1, 2), directed
+    if hasattr(graph, "adj_matrix"):
+        return np.argwhere(np.asarray(graph.adj_matrix, dtype=np.uint8)), directed
+    raise TypeError(f"Cannot convert {type(graph).__name__}.")
+
+
+class CSRGraph:
+    """Compressed Sparse Row graph.
+
+    The targets of vertex u are indices[indptr[u]:indptr[u + 1]], sorted,
+    with the matching edge weights in the same slice of weights. That is
+    one int64 per edge plus one per vertex, instead of a Python int and a
+    list slot per edge.
+    """
+
+    def __init__(
+        self,
+        num_vertices: int,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray | None = None,
+        directed: bool = True,
+    ) -> None:
+        """Wrap ready-made CSR arrays, see from_edges to build them."""
+        self.num_vertices = num_vertices
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+
+    @classmethod
+    def from_edges(cls, num_vertices: int, edges, weights=None, directed: bool = True) -> "CSRGraph":
+        """Build from an (E, 2) array of (u, v) pairs and optional weights.
+
+        An undirected graph stores every edge in both directions.
+        """
+        src, dst = _edge_array(num_vertices, edges)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != src.shape:
+                raise ValueError("Need one weight per edge.")
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            if weights is not None:
+                weights = np.concatenate([weights, weights])
+
+        indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_vertices), out=indptr[1:])
+
+        # Sort by source, then target, as one int64 key when it fits:
+        # NumPy sorts plain integer keys far faster than lexsort.
+        if num_vertices * num_vertices >= 2**63:
+            order = np.lexsort((dst, src))
+            indices = dst[order]
+        elif weights is None:
+            indices = np.sort(src * num_vertices + dst) % num_vertices
+        else:
+            order = np.argsort(src * num_vertices + dst)
+            indices = dst[order]
+        return cls(
+            num_vertices,
+            indptr,
+            indices,
+            None if weights is None else weights[order],
+            directed,
+        )
+
+    @classmethod
+    def from_graph(cls, graph) -> "CSRGraph":
+        """Convert any of the adjacency list or matrix classes."""
+        edges, directed = _stored_edges(graph)
+        csr = cls.from_edges(graph.num_vertices, edges)
+        csr.directed = directed
+        return csr
+
+    @property
+    def num_edges(self) -> int:
+        """Stored edges, each undirected edge counts twice."""
+        return len(self.indices)
+
+    @property
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbors(self, u: int) -> np.ndarray:
+        """Targets of u, a view into indices."""
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def edge_weights(self, u: int) -> np.ndarray:
+        """Weights of u's edges, aligned with neighbors(u)."""
+        if self.weights is None:
+            return np.ones(self.indptr[u + 1] - self.indptr[u])
+        return self.weights[self.indptr[u]:self.indptr[u + 1]]
+
+    def has_edge(self, u: int, v: int) -> bool:
+        targets = self.neighbors(u)
+        i = np.searchsorted(targets, v)
+        return bool(i < len(targets) and targets[i] == v)
+
+    def nbytes(self) -> int:
+        total = self.indptr.nbytes + self.indices.nbytes
+        return total + (0 if self.weights is None else self.weights.nbytes)
+
+    @property
+    def notation(self) -> tuple:
+        return self.indptr, self.indices
+
+
+class BitMatrixGraph:
+    """Adjacency Matrix with one bit per vertex pair, for dense graphs.
+
+    Row u is num_vertices bits packed into np.uint8 (most significant bit
+    first, as np.packbits does), an eighth of a byte matrix and a small
+    fraction of a list of lists.
+    """
+
+    def __init__(self, num_vertices: int, directed: bool = True) -> None:
+        """Initializes the graph with fixed number of vertices."""
+        self.num_vertices = num_vertices
+        self.directed = directed
+        self.bits = np.zeros((num_vertices, (num_vertices + 7) // 8), dtype=np.uint8)
+
+    def add_edge(self, u: int, v: int) -> None:
+        """Add an edge in matrix, both ways for an undirected graph."""
+        if not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
+            raise ValueError("Error out of bounds.")
+        self.bits[u, v >> 3] |= 0x80 >> (v & 7)
+        if not self.directed:
+            self.bits[v, u >> 3] |= 0x80 >> (u & 7)
+
+    def add_edges(self, edges) -> None:
+        """Add an (E, 2) array of edges at once."""
+        src, dst = _edge_array(self.num_vertices, edges)
+        if not self.directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        masks = (0x80 >> (dst & 7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, (src, dst >> 3), masks)
+
+    @classmethod
+    def from_edges(cls, num_vertices: int, edges, directed: bool = True) -> "BitMatrixGraph":
+        graph = cls(num_vertices, directed)
+        graph.add_edges(edges)
+        return graph
+
+    @classmethod
+    def from_graph(cls, graph) -> "BitMatrixGraph":
+        """Convert any of the adjacency list or matrix classes."""
+        edges, directed = _stored_edges(graph)
+        bit_graph = cls(graph.num_vertices, directed=True)
+        bit_graph.add_edges(edges)
+        bit_graph.directed = directed
+        return bit_graph
+
+    def has_edge(self, u: int, v: int) -> bool:
+        return bool(self.bits[u, v >> 3] & (0x80 >> (v & 7)))
+
+    def neighbors(self, u: int) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.bits[u], count=self.num_vertices))
+
+    @property
+    def out_degree(self) -> np.ndarray:
+        degree = np.empty(self.num_vertices, dtype=np.int64)
+        for start in range(0, self.num_vertices, 1024):  # bounded unpacking
+            rows = np.unpackbits(self.bits[start:start + 1024], axis=1)
+            degree[start:start + 1024] = rows.sum(axis=1)
+        return degree
+
+    def to_csr(self, chunk_rows: int = 1024) -> CSRGraph:
+        """The same graph as CSR arrays, unpacking a block of rows at a time."""
+        parts = []
+        for start in range(0, self.num_vertices, chunk_rows):
+            rows = np.unpackbits(self.bits[start:start + chunk_rows], axis=1, count=self.num_vertices)
+            src, dst = np.nonzero(rows)
+            parts.append(np.column_stack([src + start, dst]))
+        csr = CSRGraph.from_edges(self.num_vertices, np.concatenate(parts) if parts else [])
+        csr.directed = self.directed
+        return csr
+
+    @property
+    def notation(self) -> np.ndarray:
+        return self.bits
+
+
 if __name__ == "__main__":
     NUM_VERTICES = 5
     EDGES = [(0, 1), (0, 4), (1, 2), (1, 3), (1, 4), (2, 3), (3, 4)]
@@ -105,4 +310,29 @@ if __name__ == "__main__":
 
         print(cls.__name__)
         print(graph.notation)
+        print(CSRGraph.from_graph(graph).notation)
         print("\n")
+
+    for cls in (CSRGraph, BitMatrixGraph):
+        graph = cls.from_edges(NUM_VERTICES, EDGES, directed=False)
+        print(cls.__name__)
+        print(graph.notation)
+        print(graph.neighbors(1), graph.has_edge(1, 3), graph.has_edge(0, 2))
+        print("\n")
+
+    if "--bench" in sys.argv:
+        rng = np.random.default_rng(0)
+        num_vertices, num_edges = 1_000_000, 10_000_000
+        edges = rng.integers(0, num_vertices, size=(num_edges, 2))
+        start = time.perf_counter()
+        csr = CSRGraph.from_edges(num_vertices, edges)
+        print(f"CSRGraph.from_edges, {num_edges:,} edges: {time.perf_counter() - start:.2f}s, "
+              f"{csr.nbytes() / num_edges:.1f} bytes/edge")
+        start = time.perf_counter()
+        csr = CSRGraph.from_edges(num_vertices, edges, weights=rng.random(num_edges))
+        print(f"  with weights: {time.perf_counter() - start:.2f}s, {csr.nbytes() / num_edges:.1f} bytes/edge")
+
+        start = time.perf_counter()
+        dense = BitMatrixGraph.from_edges(20_000, rng.integers(0, 20_000, size=(num_edges, 2)))
+        print(f"BitMatrixGraph.from_edges, 20,000 vertices: {time.perf_counter() - start:.2f}s, "
+              f"{dense.bits.nbytes / 2**20:.1f} MiB")
@@ -0,0 +1,255 @@
+"""Immutable, array-backed trie that loads from a file with mmap.
+
+A Trie is frozen into flat arrays in breadth-first node order: the edges
+of node i are edge_start[i]:edge_start[i + 1], sorted by label (the
+character's code point), with targets giving the child node. Per node
+there is a terminal flag, the word's weight and the best weight anywhere
+below it. ranked lists each node's edges again, best subtree first, which
+drives a best-first autocomplete. The file is a short
+header followed by the raw arrays, so open() maps it and queries read the
+pages directly, shared between every process that maps the same file.
+"""
+import bisect
+import heapq
+import mmap
+import struct
+import sys
+import time
+
+import numpy as np
+
+_MAGIC = b"TRIE"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHQQ8x")  # magic, version, reserved, nodes, edges
+_NO_WORD = np.iinfo(np.int64).min
+
+
+class FrozenTrie:
+    """Read-only trie over flat arrays, built by Trie.freeze()."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        max_weights: np.ndarray,
+        edge_start: np.ndarray,
+        labels: np.ndarray,
+        targets: np.ndarray,
+        ranked: np.ndarray,
+        terminal: np.ndarray,
+        _mmap: mmap.mmap | None = None,
+    ) -> None:
+        """Wrap the arrays, see the module docstring for their layout."""
+        self.weights = weights
+        self.max_weights = max_weights
+        self.edge_start = edge_start
+        self.labels = labels
+        self.targets = targets
+        self.ranked = ranked
+        self.terminal = terminal
+        self._mmap = _mmap
+
+        # Scalar reads through memoryviews are far cheaper than NumPy indexing.
+        self._weights = memoryview(weights)
+        self._max_weights = memoryview(max_weights)
+        self._edge_start = memoryview(edge_start)
+        self._labels = memoryview(labels)
+        self._targets = memoryview(targets)
+        self._ranked = memoryview(ranked)
+        self._terminal = memoryview(terminal)
+
+    @classmethod
+    def from_trie(cls, trie) -> "FrozenTrie":
+        """Flatten a Trie, numbering its nodes breadth first."""
+        nodes = [trie.root]
+        edge_start = [0]
+        labels = []
+        targets = []
+        for node in nodes:  # grows while iterating, a BFS
+            for char in sorted(node.children):
+                labels.append(ord(char))
+                targets.append(len(nodes))
+                nodes.append(node.children[char])
+            edge_start.append(len(labels))
+
+        weights = np.fromiter(
+            (node.weight if node.is_end else 0 for node in nodes), dtype="<i8", count=len(nodes)
+        )
+        max_weights = np.fromiter(
+            (-node.top[0][0] if node.top else _NO_WORD for node in nodes), dtype="<i8", count=len(nodes)
+        )
+        terminal = np.fromiter((node.is_end for node in nodes), dtype=np.uint8, count=len(nodes))
+        edge_start = np.asarray(edge_start, dtype="<u4")
+        labels = np.asarray(labels, dtype="<u4")
+        targets = np.asarray(targets, dtype="<u4")
+
+        # Within each node, edges by best subtree weight, then label.
+        owner = np.repeat(np.arange(len(nodes)), np.diff(edge_start))
+        ranked = np.lexsort((labels, -max_weights[targets], owner)).astype("<u4")
+        return cls(weights, max_weights, edge_start, labels, targets, ranked, terminal)
+
+    def save(self, path: str) -> None:
+        """Write the header and arrays to path."""
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(self.weights), len(self.labels)))
+            for array in (self.weights, self.max_weights, self.edge_start, self.labels,
+                          self.targets, self.ranked, self.terminal):
+                f.write(array.tobytes())
+
+    @classmethod
+    def open(cls, path: str) -> "FrozenTrie":
+        """Map a saved trie read-only, nothing is copied or parsed."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, num_nodes, num_edges = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC or version != _VERSION:
+            buffer.close()
+            raise ValueError(f"{path} is not a version {_VERSION} frozen trie file.")
+
+        offset = _HEADER.size
+        arrays = []
+        for dtype, count in (("<i8", num_nodes), ("<i8", num_nodes), ("<u4", num_nodes + 1),
+                             ("<u4", num_edges), ("<u4", num_edges), ("<u4", num_edges), (np.uint8, num_nodes)):
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            arrays.append(array)
+            offset += array.nbytes
+        return cls(*arrays, _mmap=buffer)
+
+    def close(self) -> None:
+        """Unmap the file, the trie is unusable afterwards."""
+        if self._mmap is not None:
+            for view in (self._weights, self._max_weights, self._edge_start,
+                         self._labels, self._targets, self._ranked, self._terminal):
+                view.release()
+            self.weights = self.max_weights = self.edge_start = None
+            self.labels = self.targets = self.ranked = self.terminal = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "FrozenTrie":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.terminal))
+
+    def _child(self, node: int, char: str) -> int:
+        """Node reached from node over char, or -1."""
+        lo = self._edge_start[node]
+        hi = self._edge_start[node + 1]
+        code = ord(char)
+        i = bisect.bisect_left(self._labels, code, lo, hi)
+        if i < hi and self._labels[i] == code:
+            return self._targets[i]
+        return -1
+
+    def _walk(self, prefix: str) -> int:
+        node = 0
+        for char in prefix:
+            node = self._child(node, char)
+            if node < 0:
+                break
+        return node
+
+    def search(self, word: str) -> bool:
+        """Search for a word in the trie."""
+        node = self._walk(word)
+        return node >= 0 and bool(self._terminal[node])
+
+    def starts_with(self, prefix: str) -> bool:
+        """Check if a prefix exists in the trie."""
+        return self._walk(prefix) >= 0
+
+    def autocomplete(self, prefix, limit=5):
+        """Highest-weight completions, ties alphabetical, as Trie.autocomplete.
+
+        Best first: a popped subtree pushes its own word, its best child and
+        its next-ranked sibling, so each result costs a few heap operations
+        per level no matter how large the subtree is.
+        """
+        prefix = prefix.lower()
+        node = self._walk(prefix)
+        if node < 0:
+            return []
+
+        ranked, targets, labels = self._ranked, self._targets, self._labels
+        max_weights, edge_start = self._max_weights, self._edge_start
+        results = []
+        # (-weight bound, text, 0 word / 1 subtree, node, rank slot, slot end, parent text)
+        heap = [(-max_weights[node], prefix, 1, node, 0, 0, "")]
+        while heap and len(results) < limit:
+            _, text, is_subtree, node, slot, end, parent = heapq.heappop(heap)
+            if not is_subtree:
+                results.append(text)
+                continue
+            if slot + 1 < end:  # the sibling ranked right after this subtree
+                edge = ranked[slot + 1]
+                sibling = targets[edge]
+                heapq.heappush(heap, (-max_weights[sibling], parent + chr(labels[edge]), 1,
+                                      sibling, slot + 1, end, parent))
+            if self._terminal[node]:
+                heapq.heappush(heap, (-self._weights[node], text, 0, node, 0, 0, ""))
+            first, end = edge_start[node], edge_start[node + 1]
+            if first < end:
+                edge = ranked[first]
+                child = targets[edge]
+                heapq.heappush(heap, (-max_weights[child], text + chr(labels[edge]), 1, child, first, end, text))
+        return results
+
+
+def benchmark(num_words: int = 500_000) -> None:
+    """Startup cost of rebuilding a Trie versus mapping a frozen one."""
+    import os
+    import random
+    import tempfile
+
+    from tries import Trie
+
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = list({"".join(rng.choices(letters, k=rng.randint(4, 12))) for _ in range(num_words)})
+    weights = [int(rng.paretovariate(1.2)) for _ in words]
+
+    start = time.perf_counter()
+    trie = Trie()
+    for word, weight in zip(words, weights):
+        trie.insert(word, weight)
+    print(f"Trie built by insert: {time.perf_counter() - start:8.3f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "words.trie")
+        trie.freeze().save(path)
+        print(f"file size: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        start = time.perf_counter()
+        frozen = FrozenTrie.open(path)
+        print(f"FrozenTrie.open:      {time.perf_counter() - start:8.6f}s")
+
+        prefixes = [rng.choice(words)[:rng.randint(1, 4)] for _ in range(20_000)]
+        start = time.perf_counter()
+        for prefix in prefixes:
+            frozen.autocomplete(prefix, 10)
+        per_query = (time.perf_counter() - start) / len(prefixes) * 1e6
+        print(f"frozen autocomplete(limit=10): {per_query:.1f} us/query")
+        frozen.close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from tries import Trie
+
+    trie = Trie()
+    for word, weight in [("apple", 10), ("app", 0), ("application", 3), ("banana", 1), ("bat", 0)]:
+        trie.insert(word, weight)
+
+    path = os.path.join(tempfile.gettempdir(), "words.trie")
+    trie.freeze().save(path)
+    with FrozenTrie.open(path) as frozen:
+        print(len(frozen), frozen.search("app"), frozen.search("ap"), frozen.starts_with("ap"))
+        print(frozen.autocomplete("app", limit=5))  # ['apple', 'application', 'app']
+
+    if "--bench" in sys.argv:
+        benchmark()
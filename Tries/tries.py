@@ -1,25 +1,79 @@
 """Tries Data Structure."""
+import bisect
+import heapq
+import itertools
+import sys
+import time
+import tracemalloc
+
+from frozen_trie import FrozenTrie
+
+
 class TrieNode:
 
+    __slots__ = ("children", "is_end", "weight", "top")
+
     def __init__(self) -> None:
         """Initialize the TrieNode."""
         self.children = {}
         self.is_end = False
+        self.weight = 0
+        self.top = []  # best (-weight, word) entries in this subtree, ascending
 
 class Trie:
+    """Trie whose autocomplete returns the highest-weight completions.
 
-    def __init__(self) -> None:
+    Every node caches the top_k best (-weight, word) entries of its subtree,
+    kept up to date on insert, so a query only walks the prefix and slices
+    that list. Equal weights fall back to alphabetical order.
+    """
+
+    def __init__(self, top_k: int = 10) -> None:
         """Initialize the Trie."""
         self.root = TrieNode()
+        self.top_k = top_k
 
-    def insert(self, word: str) -> None:
-        """Insert a word into the trie."""
+    def insert(self, word: str, weight: int = 0) -> None:
+        """Insert a word into the trie, or update the weight of a stored word."""
         node = self.root # node is root node
+        path = [node]
         for char in word:
             if char not in node.children:
                 node.children[char] = TrieNode()
             node = node.children[char]
+            path.append(node)
+
+        old = (-node.weight, word) if node.is_end else None
+        entry = (-weight, word)
         node.is_end = True
+        node.weight = weight
+        if entry == old:
+            return
+        for depth in reversed(range(len(path))):  # children settle before parents
+            self._update_top(path[depth], word, depth, entry, old)
+
+    def _update_top(self, node: TrieNode, word: str, depth: int, entry: tuple, old: tuple | None) -> None:
+        top = node.top
+        if old is not None and old in top:
+            if entry > old:  # weight went down, something else may now rank
+                self._recompute_top(node, word[:depth])
+                return
+            top.remove(old)
+        elif top and len(top) == self.top_k and entry > top[-1]:
+            return
+        bisect.insort(top, entry)
+        del top[self.top_k:]
+
+    def _recompute_top(self, node: TrieNode, prefix: str) -> None:
+        """Rebuild node.top from its children's lists and its own word."""
+        candidates = [child.top for child in node.children.values()]
+        if node.is_end:
+            candidates.append([(-node.weight, prefix)])
+        node.top = heapq.nsmallest(self.top_k, itertools.chain.from_iterable(candidates))
+
+    def freeze(self) -> FrozenTrie:
+        """Immutable array-backed copy of the trie, see frozen_trie."""
+        return FrozenTrie.from_trie(self)
 
     def search(self, word: str) -> bool:
         """Search for a word in the trie."""
@@ -39,29 +93,271 @@ class Trie:
             node = node.children[char]
         return True
     
-    def _dfs(self, node: TrieNode, prefix: str, results: list[str], limit: int) -> None:
-        if len(results) == limit:
-            return  # Stop once limit is reached
-        if node.is_end:
-            results.append(prefix)
-        for char in sorted(node.children):  # sort to return alphabetically
-            self._dfs(node.children[char], prefix + char, results, limit)
+    def _dfs(self, node: TrieNode, prefix: str):
+        """Yield (-weight, word) for every word below node, iteratively."""
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            if node.is_end:
+                yield -node.weight, prefix
+            for char, child in node.children.items():
+                stack.append((child, prefix + char))
 
 
     def autocomplete(self, prefix, limit=5):
         prefix = prefix.lower()
         current = self.root
-        results = []
 
         for char in prefix:
             if char not in current.children:
                 return []
             current = current.children[char]
 
-        self._dfs(current, prefix, results, limit)
+        if limit <= self.top_k:
+            return [word for _, word in current.top[:limit]]
+        return [word for _, word in heapq.nsmallest(limit, self._dfs(current, prefix))]
+
+    def _levenshtein_walk(self, word: str, max_distance: int):
+        """Yield (node, path, row) for every node within reach of word.
+
+        row[j] is the edit distance between path and word[:j], computed one
+        trie edge at a time from the parent's row. Subtrees are pruned once
+        the smallest entry exceeds max_distance, no extension can recover.
+        """
+        stack = [(self.root, "", list(range(len(word) + 1)))]
+        while stack:
+            node, path, row = stack.pop()
+            yield node, path, row
+            for char, child in node.children.items():
+                value = lowest = row[0] + 1
+                next_row = [value]
+                for diagonal, above, letter in zip(row, row[1:], word):
+                    value += 1  # insertion
+                    if above < value:
+                        value = above + 1  # deletion
+                    if letter == char and diagonal < value:
+                        value = diagonal  # match
+                    elif diagonal + 1 < value:
+                        value = diagonal + 1  # substitution
+                    next_row.append(value)
+                    if value < lowest:
+                        lowest = value
+                if lowest <= max_distance:
+                    stack.append((child, path + char, next_row))
+
+    def fuzzy_search(self, word: str, max_distance: int = 1) -> list[tuple[str, int]]:
+        """Stored words within max_distance edits of word, as (word, distance).
+
+        Sorted by distance, then weight and alphabetically like autocomplete.
+        """
+        matches = [
+            (row[-1], -node.weight, path)
+            for node, path, row in self._levenshtein_walk(word, max_distance)
+            if node.is_end and row[-1] <= max_distance
+        ]
+        return [(path, distance) for distance, _, path in sorted(matches)]
+
+    def fuzzy_autocomplete(self, prefix: str, max_distance: int = 1, limit: int = 5) -> list[str]:
+        """Completions of any prefix within max_distance edits of prefix.
+
+        A word's distance is that of its closest matching prefix. Results
+        rank by distance, then as autocomplete does.
+        """
+        prefix = prefix.lower()
+        best = {}
+        for node, path, row in self._levenshtein_walk(prefix, max_distance):
+            distance = row[-1]
+            if distance > max_distance:
+                continue
+            # Anything ranked out of a node's top list is beaten by its cached
+            # words, which are at least as close, so the caches suffice.
+            if limit <= self.top_k:
+                entries = node.top[:limit]
+            else:
+                entries = self._dfs(node, path)
+            for neg_weight, word in entries:
+                if best.get(word, (max_distance + 1,))[0] > distance:
+                    best[word] = (distance, neg_weight, word)
+        return [word for _, _, word in heapq.nsmallest(limit, best.values())]
+
+
+class RadixNode:
+
+    __slots__ = ("label", "children", "is_end")
+
+    def __init__(self, label: str = "", is_end: bool = False) -> None:
+        """Initialize the RadixNode, an edge label plus the node it leads to."""
+        self.label = label
+        # None for a leaf, a tuple of nodes while small, a dict by first char after.
+        self.children = None
+        self.is_end = is_end
+
+    def child(self, char: str) -> "RadixNode | None":
+        """The child whose label starts with char, if any."""
+        children = self.children
+        if children is None:
+            return None
+        if type(children) is dict:
+            return children.get(char)
+        for child in children:
+            if child.label[0] == char:
+                return child
+        return None
+
+    def set_child(self, node: "RadixNode") -> None:
+        """Add node as a child, replacing the one with the same first char."""
+        char = node.label[0]
+        children = self.children
+        if children is None:
+            self.children = (node,)
+        elif type(children) is dict:
+            children[char] = node
+        else:
+            for i, child in enumerate(children):
+                if child.label[0] == char:
+                    self.children = children[:i] + (node,) + children[i + 1:]
+                    return
+            if len(children) < RadixTrie.SMALL_CHILDREN:
+                self.children = children + (node,)
+            else:
+                self.children = {child.label[0]: child for child in children}
+                self.children[char] = node
+
+    def sorted_children(self) -> list["RadixNode"]:
+        if self.children is None:
+            return []
+        children = self.children.values() if type(self.children) is dict else self.children
+        return sorted(children, key=lambda child: child.label)
+
+
+class RadixTrie:
+    """Compressed (Patricia) trie with the same API as Trie.
+
+    Chains of single-child nodes are merged into one edge label, so a node
+    exists only where words branch or end. Children are kept in a tuple
+    until there are more than SMALL_CHILDREN of them.
+    """
+
+    SMALL_CHILDREN = 8
+
+    def __init__(self) -> None:
+        """Initialize the RadixTrie."""
+        self.root = RadixNode()
+
+    def insert(self, word: str) -> None:
+        """Insert a word into the trie."""
+        node = self.root
+        rest = word
+        while rest:
+            child = node.child(rest[0])
+            if child is None:
+                node.set_child(RadixNode(rest, is_end=True))
+                return
+            label = child.label
+            common = 1
+            limit = min(len(label), len(rest))
+            while common < limit and label[common] == rest[common]:
+                common += 1
+            if common == len(label):
+                node = child
+                rest = rest[common:]
+                continue
+
+            # Split the edge where the word leaves it.
+            middle = RadixNode(label[:common])
+            node.set_child(middle)  # before relabelling, it matches child by first char
+            child.label = label[common:]
+            middle.set_child(child)
+            if common == len(rest):
+                middle.is_end = True
+            else:
+                middle.set_child(RadixNode(rest[common:], is_end=True))
+            return
+        node.is_end = True
+
+    def _locate(self, prefix: str) -> tuple[RadixNode | None, str]:
+        """Shallowest node whose path starts with prefix, and that path."""
+        node = self.root
+        path = ""
+        rest = prefix
+        while rest:
+            child = node.child(rest[0])
+            if child is None:
+                return None, ""
+            label = child.label
+            if rest.startswith(label):
+                rest = rest[len(label):]
+            elif label.startswith(rest):
+                rest = ""
+            else:
+                return None, ""
+            node = child
+            path += label
+        return node, path
+
+    def search(self, word: str) -> bool:
+        """Search for a word in the trie."""
+        node, path = self._locate(word)
+        return node is not None and node.is_end and len(path) == len(word)
+
+    def starts_with(self, prefix: str) -> bool:
+        """Check if a prefix exists in the trie."""
+        return self._locate(prefix)[0] is not None
+
+    def autocomplete(self, prefix, limit=5):
+        prefix = prefix.lower()
+        node, path = self._locate(prefix)
+        if node is None:
+            return []
+
+        results = []
+        stack = [(node, path)]
+        while stack and len(results) < limit:
+            node, path = stack.pop()
+            if node.is_end:
+                results.append(path)
+            for child in reversed(node.sorted_children()):  # alphabetical pops
+                stack.append((child, path + child.label))
         return results
 
 
+def latency_report(trie: Trie, prefixes: list[str], limit: int = 10) -> None:
+    """p50/p99 autocomplete latency over the given prefixes."""
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        trie.autocomplete(prefix, limit)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    print(f"autocomplete(limit={limit}): p50 {p50:.1f} us, p99 {p99:.1f} us")
+
+
+def fuzzy_report(trie: Trie, queries: list[str], distances=(1, 2)) -> None:
+    """Mean fuzzy_search and fuzzy_autocomplete time per query."""
+    for max_distance in distances:
+        for method in (trie.fuzzy_search, trie.fuzzy_autocomplete):
+            start = time.perf_counter()
+            for query in queries:
+                method(query, max_distance)
+            per_query = (time.perf_counter() - start) / len(queries) * 1e3
+            print(f"{method.__name__}(max_distance={max_distance}): {per_query:8.2f} ms/query")
+
+
+def memory_report(words: list[str]) -> None:
+    """Bytes per stored word for Trie and RadixTrie, measured with tracemalloc."""
+    for cls in (Trie, RadixTrie):
+        tracemalloc.start()
+        trie = cls()
+        for word in words:
+            trie.insert(word)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{cls.__name__:>9}: {used / 2**20:8.1f} MiB, {used / len(words):6.1f} bytes/word")
+        del trie
+
+
 if __name__ == "__main__":
     trie = Trie()
 
@@ -72,6 +368,45 @@ if __name__ == "__main__":
 
     print(trie.autocomplete(prefix="app", limit=5))
 
+    trie.insert("apple", weight=10)
+    trie.insert("application", weight=3)
+    print(trie.autocomplete(prefix="app", limit=5))  # ['apple', 'application', 'app']
+    print(trie.fuzzy_search("bal", max_distance=1))  # [('ball', 1), ('bat', 1)]
+    print(trie.fuzzy_autocomplete("aplp", max_distance=1))
+
+    radix = RadixTrie()
+    for word in words:
+        radix.insert(word)
+    print(radix.autocomplete(prefix="app", limit=5))
+    print(radix.search("app"), radix.search("ap"), radix.starts_with("ap"))
+
+    if "--bench" in sys.argv:
+        import random
+
+        rng = random.Random(0)
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        dictionary = list({"".join(rng.choices(letters, k=rng.randint(4, 12))) for _ in range(500_000)})
+        memory_report(dictionary)
+
+        weighted = Trie()
+        for word in dictionary:
+            weighted.insert(word, weight=int(rng.paretovariate(1.2)))
+        latency_report(weighted, [rng.choice(dictionary)[:rng.randint(1, 4)] for _ in range(100_000)])
+        del weighted
+
+        million = set()
+        while len(million) < 1_000_000:
+            million.add("".join(rng.choices(letters, k=rng.randint(4, 12))))
+        million = list(million)
+        fuzzy = Trie()
+        for word in million:
+            fuzzy.insert(word, weight=int(rng.paretovariate(1.2)))
+        typos = []
+        for word in rng.sample(million, 50):
+            i = rng.randrange(len(word))
+            typos.append(word[:i] + rng.choice(letters) + word[i + 1:])
+        fuzzy_report(fuzzy, typos)
+
     # print(trie.search("apple"))
     # print(trie.starts_with("app"))
     # print(trie.search("app"))